@@ -2,29 +2,60 @@ import re
 from config_log import logger
 from sqlalchemy.orm import Session
 from models import Recompensa
-import requests
+import cliente_http
+from cache_api import cache
+import cache_leitura
+import config
+import metricas
 
+class RecompensaIndisponivel(Exception):
+    # Falha que não se resolve com novas tentativas (ex.: a PokéAPI responde 404
+    # para uma pontuação acima do último Pokémon)
+    pass
+
+def _erro_permanente(status_code) -> bool:
+    # Erros 4xx (exceto 408 e 429) não mudam ao repetir a mesma requisição
+    return 400 <= status_code < 500 and status_code not in (408, 429)
+
+def _buscar_json(url: str):
+    dados = cache.get(url)
+    if dados is not None:
+        logger.debug("Resposta em cache para %s", url)
+        return dados, 200
+
+    resposta = cliente_http.sessao().get(url)
+    if resposta.status_code != 200:
+        return None, resposta.status_code
+    dados = resposta.json()
+    cache.set(url, dados)
+    return dados, 200
+
+@metricas.cronometrar("extract")
 def Extract_API(pontuacao: int):
-    logger.info(f"Iniciando extração da API - pontuação: {pontuacao}")
-    url = f"https://pokeapi.co/api/v2/pokemon/{pontuacao}"
+    logger.info("Iniciando extração da API - pontuação: %s", pontuacao)
+    url = f"{config.POKEAPI_URL}/pokemon/{pontuacao}"
 
-    info = requests.get(url, timeout = 10)
-    if info.status_code != 200:
-        logger.error(f"Erro ao acessar URL: {info.status_code}")
+    informacao, status_code = _buscar_json(url)
+    if informacao is None:
+        logger.error("Erro ao acessar URL: %s", status_code)
+        if _erro_permanente(status_code):
+            raise RecompensaIndisponivel(f"PokéAPI respondeu {status_code} para a pontuação {pontuacao}")
         return None, None
-    informacao = info.json()
     
     species_url = informacao['species']['url']
-    logger.info(f"Buscando dados de espécie: {species_url}")
+    logger.info("Buscando dados de espécie: %s", species_url)
     
-    species = requests.get(species_url, timeout = 10)
-    if species.status_code != 200:
-        logger.error(f"Erro ao buscar espécie: {species.status_code}")
+    especie, status_code = _buscar_json(species_url)
+    if especie is None:
+        logger.error("Erro ao buscar espécie: %s", status_code)
+        if _erro_permanente(status_code):
+            raise RecompensaIndisponivel(f"PokéAPI respondeu {status_code} para a espécie {species_url}")
         return informacao, None
 
-    return informacao, species.json()
+    return informacao, especie
 
 
+@metricas.cronometrar("transform")
 def Transform_API(info, esp):
     if not info or not esp:
         logger.warning("info ou esp estão nulos.")
@@ -36,25 +67,47 @@ def Transform_API(info, esp):
     for entry in esp['flavor_text_entries']:
         descricao = str(entry['flavor_text'].replace('\n', ' ').replace('\f', ' ')).capitalize()
 
-    logger.info(f"Transform_API concluída para: {nome}")
+    logger.info("Transform_API concluída para: %s", nome)
     return nome, foto, descricao
 
+@metricas.cronometrar("load")
 def Load_API(result, db: Session):
-    logger.debug(f"Criando recompensa para hist: {result.idhist}")
+    logger.debug("Criando recompensa para hist: %s", result.idhist)
 
     total_pontos = result.pontos or 0
     if total_pontos == 0 or result.idhist is None:
-        logger.warning(f"Usuário não pode ser cadastrado com falta de informações.")
+        logger.warning("Usuário não pode ser cadastrado com falta de informações.")
         return None
 
     exst = db.query(Recompensa).filter(Recompensa.idhist == result.idhist).first()
 
     if exst:
-        logger.info(f"Recompensa já existe para id {result.idhist}")
+        logger.info("Recompensa já existe para id %s", result.idhist)
         return exst
     
     db.add(result)
     db.commit()
+    cache_leitura.cache.invalidar(Recompensa.__tablename__, result.idhist)
     db.refresh(result)
-    logger.info(f"Recompensa criada para histórico {result.idhist}")
-    return result
\ No newline at end of file
+    logger.info("Recompensa criada para histórico %s", result.idhist)
+    return result
+
+def criar_recom(pontos, db: Session, idhist: int):
+    if not pontos:
+        logger.warning("Histórico %s sem pontuação, recompensa não será gerada", idhist)
+        return None
+    logger.info("Realizando etapa de extração na recompensa de idhist %s", idhist)
+    info, especie = Extract_API(pontos)
+    logger.info("Realizando etapa de transformação na recompensa de idhist %s", idhist)
+    nome, foto, descricao = Transform_API(info, especie)
+    if nome is None:
+        raise RuntimeError(f"Não foi possível obter a recompensa para a pontuação {pontos}")
+    new_result = Recompensa(
+            idhist=idhist,
+            nome=nome,
+            descricao=descricao,
+            imagem_url=foto,
+            pontos=pontos
+        )
+    logger.info("Realizando etapa de carregamento na recompensa de idhist %s", idhist)
+    return Load_API(new_result, db)
@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from semente import criar_engine, popular
+from servidor import iniciar_api, parar_api, resumo_latencias
+
+# Carga HTTP com alta concorrência contra a API rodando no uvicorn. Para comparar
+# as rotas síncronas (threadpool) com as assíncronas, rode contra uma cópia do
+# código anterior, por exemplo:
+#   git worktree add /tmp/api-sync <commit anterior>
+#   python benchmarks/bench_async.py --apps /tmp/api-sync . --concorrencia 200
+
+USUARIOS = 1000
+TAREFAS = 200
+
+async def _carga(url, args):
+    latencias = []
+    erros = 0
+    fim = time.perf_counter() + args.segundos
+    limites = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+
+    async def cliente_virtual(cliente, seed):
+        nonlocal erros
+        rnd = random.Random(seed)
+        while time.perf_counter() < fim:
+            sorteio = rnd.random()
+            inicio = time.perf_counter()
+            try:
+                if sorteio < 0.4:
+                    r = await cliente.get(f"{url}/task/", params={"id": rnd.randint(1, TAREFAS)})
+                elif sorteio < 0.7:
+                    r = await cliente.get(f"{url}/user/", params={"id": rnd.randint(1, USUARIOS)})
+                elif sorteio < 0.9:
+                    r = await cliente.get(f"{url}/hist/", params={"after_id": rnd.randint(1, args.historicos), "limit": 50})
+                else:
+                    r = await cliente.patch(f"{url}/user/{rnd.randint(1, USUARIOS)}", json={"idade": rnd.randint(18, 70)})
+            except httpx.TransportError:
+                erros += 1
+                continue
+            latencias.append(time.perf_counter() - inicio)
+            if r.status_code >= 400:
+                erros += 1
+
+    async with httpx.AsyncClient(limits=limites, timeout=60) as cliente:
+        await asyncio.gather(*(cliente_virtual(cliente, i) for i in range(args.concorrencia)))
+
+    return resumo_latencias(latencias, args.segundos, erros)
+
+def executar(app, args):
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = str(Path(pasta) / "bench.db")
+        engine = criar_engine(caminho)
+        popular(engine, usuarios=USUARIOS, tarefas=TAREFAS, historicos=args.historicos)
+        engine.dispose()
+
+        processo, url = iniciar_api(app, pasta, caminho)
+        try:
+            resultado = asyncio.run(_carga(url, args))
+        finally:
+            parar_api(processo)
+
+    return {"app": str(app), "concorrencia": args.concorrencia, **resultado}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apps", nargs="+", default=[str(Path(__file__).resolve().parent.parent)])
+    parser.add_argument("--concorrencia", type=int, default=200)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--historicos", type=int, default=50000)
+    args = parser.parse_args()
+    resultados = [executar(app, args) for app in args.apps]
+    print(json.dumps(resultados, indent=4, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
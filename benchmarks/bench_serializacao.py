@@ -0,0 +1,67 @@
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import Usuario, Tarefa, Historico, Recompensa
+import schemas
+import serializacao
+from semente import criar_engine, popular
+
+# Compara, por rota de listagem, o caminho antigo (ORM + from_orm +
+# jsonable_encoder + JSONResponse) com o caminho rápido (select do Core +
+# dict + serializacao.JSONRapida). Uso: python benchmarks/bench_serializacao.py
+
+ROTAS = [
+    ("/task/", Tarefa, schemas.TaskOut, lambda: [Tarefa.dt_exclusao == None]),
+    ("/user/", Usuario, schemas.UserOut, lambda: [Usuario.dt_exclusao == None]),
+    ("/hist/", Historico, schemas.HistOut, lambda: [Historico.dt_exclusao == None]),
+    ("/recom/", Recompensa, schemas.RecomOut, lambda: []),
+]
+
+def antigo(db, model, schema, filtros):
+    objetos = db.query(model).filter(*filtros).all()
+    return JSONResponse(content=[jsonable_encoder(schema.model_validate(o)) for o in objetos]).body
+
+def rapido(db, model, schema, filtros):
+    campos = serializacao.campos_out(schema)
+    linhas = db.execute(select(*[getattr(model, c) for c in campos]).where(*filtros)).all()
+    return serializacao.JSONRapida(content=[serializacao.registro(l, campos) for l in linhas]).body
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        corpo = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), corpo
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=20000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = criar_engine(str(Path(pasta) / "bench.db"))
+        popular(engine, usuarios=args.linhas, tarefas=args.linhas, historicos=args.linhas)
+        print(f"{'rota':8} {'linhas':>8} {'antigo (ms)':>12} {'rápido (ms)':>12} {'ganho':>7}  idêntico")
+        with Session(engine) as db:
+            for rota, model, schema, filtros in ROTAS:
+                t_antigo, corpo_antigo = medir(lambda: antigo(db, model, schema, filtros()), args.repeticoes)
+                db.expunge_all()
+                t_rapido, corpo_rapido = medir(lambda: rapido(db, model, schema, filtros()), args.repeticoes)
+                linhas = corpo_rapido.count(b"{")
+                print(f"{rota:8} {linhas:>8} {t_antigo * 1000:>12.1f} {t_rapido * 1000:>12.1f} "
+                      f"{t_antigo / t_rapido:>6.1f}x  {corpo_antigo == corpo_rapido}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from models import Historico, Tarefa
+from semente import criar_engine, popular
+
+# Mede a vazão de leitura e escrita concorrentes no SQLite com o perfil de
+# engine padrão e com o perfil otimizado (WAL + PRAGMAs).
+# Uso: python benchmarks/bench_sqlite.py --leitores 8 --escritores 2 --segundos 10
+
+def executar(perfil, args):
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = criar_engine(str(Path(pasta) / "bench.db"), perfil)
+        popular(engine, usuarios=1000, tarefas=200, historicos=args.historicos)
+        Sessao = sessionmaker(bind=engine)
+        fim = time.perf_counter() + args.segundos
+        contagem = {"leituras": 0, "escritas": 0, "bloqueios": 0}
+        lock = threading.Lock()
+
+        def leitor(seed):
+            rnd = random.Random(seed)
+            feitas = 0
+            with Sessao() as db:
+                while time.perf_counter() < fim:
+                    idusuario = rnd.randint(1, 1000)
+                    db.execute(
+                        select(Historico.idhist, Historico.finalizada)
+                        .where(Historico.idusuario == idusuario, Historico.dt_exclusao == None)
+                    ).all()
+                    db.rollback()
+                    feitas += 1
+            with lock:
+                contagem["leituras"] += feitas
+
+        def escritor(seed):
+            rnd = random.Random(seed)
+            feitas = bloqueios = 0
+            while time.perf_counter() < fim:
+                try:
+                    with Sessao() as db:
+                        db.add(Historico(nome="bench", descricao="bench", idusuario=rnd.randint(1, 1000),
+                                         idtarefa=rnd.randint(1, 200), finalizada=False))
+                        db.execute(update(Tarefa).where(Tarefa.idtarefa == rnd.randint(1, 200)).values(pontos=rnd.randint(1, 20)))
+                        db.commit()
+                    feitas += 1
+                except OperationalError:
+                    bloqueios += 1
+            with lock:
+                contagem["escritas"] += feitas
+                contagem["bloqueios"] += bloqueios
+
+        threads = [threading.Thread(target=leitor, args=(i,)) for i in range(args.leitores)]
+        threads += [threading.Thread(target=escritor, args=(100 + i,)) for i in range(args.escritores)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    return {
+        "perfil": perfil,
+        "leituras_por_s": round(contagem["leituras"] / args.segundos, 1),
+        "escritas_por_s": round(contagem["escritas"] / args.segundos, 1),
+        "erros_bloqueio": contagem["bloqueios"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leitores", type=int, default=8)
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--historicos", type=int, default=50000)
+    args = parser.parse_args()
+    resultados = [executar(perfil, args) for perfil in ("padrao", "otimizado")]
+    print(json.dumps(resultados, indent=4, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import Usuario, Tarefa, Historico, Recompensa
+import schemas
+import serializacao
+from semente import criar_engine, popular
+
+# Compara, por rota de listagem, a resposta XML do dicttoxml (usado antes por
+# format_response) com o codificador de serializacao.XMLRapida, sobre as mesmas
+# linhas já lidas do banco (históricos = 10x linhas, para haver recompensas
+# suficientes). O dicttoxml não é mais dependência da API:
+#   pip install dicttoxml && python benchmarks/bench_xml.py --linhas 10000
+
+ROTAS = [
+    ("/task/", Tarefa, schemas.TaskOut, lambda: [Tarefa.dt_exclusao == None]),
+    ("/user/", Usuario, schemas.UserOut, lambda: [Usuario.dt_exclusao == None]),
+    ("/hist/", Historico, schemas.HistOut, lambda: [Historico.dt_exclusao == None]),
+    ("/recom/", Recompensa, schemas.RecomOut, lambda: []),
+]
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        corpo = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), corpo
+
+def main():
+    from dicttoxml import dicttoxml
+    # O dicttoxml registra cada elemento em INFO; o log dele ficaria no Tarefas.log
+    logging.getLogger("dicttoxml").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = criar_engine(str(Path(pasta) / "bench.db"))
+        popular(engine, usuarios=args.linhas, tarefas=args.linhas, historicos=args.linhas * 10)
+        print(f"{'rota':8} {'linhas':>8} {'dicttoxml (ms)':>15} {'XMLRapida (ms)':>15} {'ganho':>7}  idêntico")
+        with Session(engine) as db:
+            for rota, model, schema, filtros in ROTAS:
+                campos = serializacao.campos_out(schema)
+                linhas = db.execute(select(*[getattr(model, c) for c in campos]).where(*filtros()).limit(args.linhas)).all()
+                dados = [serializacao.registro(l, campos) for l in linhas]
+                t_antigo, corpo_antigo = medir(
+                    lambda: dicttoxml(jsonable_encoder(dados), custom_root="response", attr_type=False),
+                    args.repeticoes
+                )
+                t_rapido, corpo_rapido = medir(lambda: serializacao.XMLRapida(content=dados).body, args.repeticoes)
+                print(f"{rota:8} {len(dados):>8} {t_antigo * 1000:>15.1f} {t_rapido * 1000:>15.1f} "
+                      f"{t_antigo / t_rapido:>6.1f}x  {corpo_antigo == corpo_rapido}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
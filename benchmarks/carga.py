@@ -0,0 +1,197 @@
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import httpx
+import pokeapi_stub
+from semente import criar_engine, popular
+from servidor import iniciar_api, parar_api, resumo_latencias
+
+# Suíte de carga da API: popula um banco temporário com o volume escolhido,
+# sobe a API no uvicorn apontando para uma PokéAPI local (pokeapi_stub) e roda
+# um cenário concorrente por rota, um de cada vez. O resultado (p50/p95/p99 e
+# vazão por cenário) sai em JSON para comparar execuções.
+# Uso: python benchmarks/carga.py --volume 100k --concorrencia 50 --segundos 5 --saida resultado.json
+
+VOLUMES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+def _historico(rnd, estado, finalizada=None):
+    return {
+        "nome": "Carga", "descricao": "Histórico criado pelo benchmark",
+        "idusuario": rnd.randint(1, estado["usuarios"]), "idtarefa": rnd.randint(1, estado["tarefas"]),
+        "finalizada": rnd.random() < 0.5 if finalizada is None else finalizada
+    }
+
+def _tarefa(rnd):
+    return {"titulo": "Carga", "descricao": "Tarefa criada pelo benchmark", "pontos": rnd.randint(1, 20)}
+
+def _usuario(rnd):
+    return {"nome": "Carga", "idade": rnd.randint(18, 70), "sexo": rnd.choice(["Feminino", "Masculino"])}
+
+def _excluir(estado, tabela):
+    # Cada exclusão usa um id ainda não excluído, do fim da faixa populada
+    estado[f"excluir_{tabela}"] -= 1
+    return estado[f"excluir_{tabela}"] + 1
+
+async def _recompensa(c, rnd, estado):
+    # Caminho completo da recompensa: novo usuário + histórico finalizado, e
+    # espera a fila consultar a PokéAPI local e gravar a recompensa
+    usuario = (await c.post("/user/bulk", json=[_usuario(rnd)])).json()["criados"][0]
+    dados = {**_historico(rnd, estado, finalizada=True), "idusuario": usuario}
+    idhist = (await c.post("/hist/bulk", json=[dados])).json()["criados"][0]
+    limite = time.perf_counter() + estado["timeout_recompensa"]
+    while time.perf_counter() < limite:
+        r = await c.get("/recom/", params={"id": idhist})
+        if r.status_code == 200:
+            return r
+        await asyncio.sleep(0.05)
+    return r
+
+# (nome, requisição). Os cenários de exclusão ficam por último para não afetar os demais
+CENARIOS = [
+    ("GET /", lambda c, rnd, e: c.get("/")),
+    ("GET /task/?id", lambda c, rnd, e: c.get("/task/", params={"id": rnd.randint(1, e["tarefas"])})),
+    ("GET /task/", lambda c, rnd, e: c.get("/task/", params={"after_id": rnd.randint(0, e["tarefas"]), "limit": 50})),
+    ("GET /task/ xml", lambda c, rnd, e: c.get("/task/", params={"after_id": rnd.randint(0, e["tarefas"]), "limit": 50}, headers={"Accept": "application/xml"})),
+    ("GET /user/?id", lambda c, rnd, e: c.get("/user/", params={"id": rnd.randint(1, e["usuarios"])})),
+    ("GET /user/", lambda c, rnd, e: c.get("/user/", params={"after_id": rnd.randint(0, e["usuarios"]), "limit": 50})),
+    ("GET /hist/?id", lambda c, rnd, e: c.get("/hist/", params={"id": rnd.randint(1, e["historicos"])})),
+    ("GET /hist/", lambda c, rnd, e: c.get("/hist/", params={"after_id": rnd.randint(0, e["historicos"]), "limit": 50})),
+    ("GET /hist/ fields", lambda c, rnd, e: c.get("/hist/", params={"after_id": rnd.randint(0, e["historicos"]), "limit": 50, "fields": "idhist,finalizada"})),
+    ("GET /hist/ stream", lambda c, rnd, e: c.get("/hist/", params={"after_id": rnd.randint(0, e["historicos"]), "limit": 1000}, headers={"Accept": "application/x-ndjson"})),
+    ("GET /recom/?id", lambda c, rnd, e: c.get("/recom/", params={"id": rnd.randint(1, e["recompensas"])})),
+    ("GET /recom/", lambda c, rnd, e: c.get("/recom/", params={"after_id": rnd.randint(0, e["recompensas"]), "limit": 50})),
+    ("GET /job/{id}", lambda c, rnd, e: c.get(f"/job/{rnd.randint(1, 100)}")),
+    ("GET /admin/log", lambda c, rnd, e: c.get("/admin/log")),
+    ("PUT /admin/log", lambda c, rnd, e: c.put("/admin/log", json={"nivel": "WARNING"})),
+    ("GET /admin/cache", lambda c, rnd, e: c.get("/admin/cache")),
+    ("POST /task/", lambda c, rnd, e: c.post("/task/", json=_tarefa(rnd))),
+    ("POST /task/bulk", lambda c, rnd, e: c.post("/task/bulk", json=[_tarefa(rnd) for _ in range(50)])),
+    ("PATCH /task/{id}", lambda c, rnd, e: c.patch(f"/task/{rnd.randint(1, e['tarefas'] // 2)}", json={"pontos": rnd.randint(1, 20)})),
+    ("PATCH /task/bulk", lambda c, rnd, e: c.patch("/task/bulk", json=[{"idtarefa": rnd.randint(1, e["tarefas"] // 2), "pontos": rnd.randint(1, 20)} for _ in range(10)])),
+    ("POST /user/", lambda c, rnd, e: c.post("/user/", json=_usuario(rnd))),
+    ("POST /user/bulk", lambda c, rnd, e: c.post("/user/bulk", json=[_usuario(rnd) for _ in range(50)])),
+    ("PATCH /user/{id}", lambda c, rnd, e: c.patch(f"/user/{rnd.randint(1, e['usuarios'] // 2)}", json={"idade": rnd.randint(18, 70)})),
+    ("PATCH /user/bulk", lambda c, rnd, e: c.patch("/user/bulk", json=[{"idusuario": rnd.randint(1, e["usuarios"] // 2), "idade": rnd.randint(18, 70)} for _ in range(50)])),
+    ("POST /hist/", lambda c, rnd, e: c.post("/hist/", json=_historico(rnd, e, finalizada=False))),
+    ("POST /hist/bulk", lambda c, rnd, e: c.post("/hist/bulk", json=[_historico(rnd, e, finalizada=False) for _ in range(50)])),
+    ("PATCH /hist/{id}", lambda c, rnd, e: c.patch(f"/hist/{rnd.randint(1, e['historicos'] // 2)}", json={"descricao": "Alterado pelo benchmark"})),
+    ("PATCH /hist/bulk", lambda c, rnd, e: c.patch("/hist/bulk", json=[{"idhist": rnd.randint(1, e["historicos"] // 2), "descricao": "Alterado"} for _ in range(50)])),
+    ("recompensa (POST /hist/ finalizado -> GET /recom/)", _recompensa),
+    ("DELETE /task/{id}", lambda c, rnd, e: c.delete(f"/task/{_excluir(e, 'tarefas')}")),
+    ("DELETE /task/bulk", lambda c, rnd, e: c.request("DELETE", "/task/bulk", json=[_excluir(e, "tarefas") for _ in range(10)])),
+    ("DELETE /user/{id}", lambda c, rnd, e: c.delete(f"/user/{_excluir(e, 'usuarios')}")),
+    ("DELETE /user/bulk", lambda c, rnd, e: c.request("DELETE", "/user/bulk", json=[_excluir(e, "usuarios") for _ in range(10)])),
+    ("DELETE /hist/{id}", lambda c, rnd, e: c.delete(f"/hist/{_excluir(e, 'historicos')}")),
+    ("DELETE /hist/bulk", lambda c, rnd, e: c.request("DELETE", "/hist/bulk", json=[_excluir(e, "historicos") for _ in range(10)])),
+]
+
+async def _executar_cenario(url, nome, requisicao, estado, args):
+    latencias = []
+    status = Counter()
+    erros = 0
+    fim = time.perf_counter() + args.segundos
+    limites = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+
+    async def cliente_virtual(cliente, seed):
+        nonlocal erros
+        rnd = random.Random(seed)
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            try:
+                r = await requisicao(cliente, rnd, estado)
+            except (httpx.TransportError, KeyError, IndexError, ValueError):
+                erros += 1
+                continue
+            latencias.append(time.perf_counter() - inicio)
+            status[r.status_code] += 1
+            if r.status_code >= 500:
+                erros += 1
+
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as cliente:
+        await asyncio.gather(*(cliente_virtual(cliente, f"{nome}-{i}") for i in range(args.concorrencia)))
+
+    return {"cenario": nome, **resumo_latencias(latencias, args.segundos, erros), "status": dict(sorted(status.items()))}
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--volume", choices=VOLUMES, default="10k", help="quantidade de históricos (usuários = 1/10, tarefas = 1/100)")
+    parser.add_argument("--usuarios", type=int)
+    parser.add_argument("--tarefas", type=int)
+    parser.add_argument("--historicos", type=int)
+    parser.add_argument("--concorrencia", type=int, default=50)
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--latencia-pokeapi-ms", type=float, default=100)
+    parser.add_argument("--timeout-recompensa", type=float, default=30)
+    parser.add_argument("--cenarios", nargs="*", help="executa apenas os cenários cujo nome contém um destes textos")
+    parser.add_argument("--app", default=str(RAIZ))
+    parser.add_argument("--saida", help="arquivo JSON do resultado (padrão: stdout)")
+    args = parser.parse_args()
+
+    historicos = args.historicos or VOLUMES[args.volume]
+    usuarios = args.usuarios or max(100, historicos // 10)
+    tarefas = args.tarefas or max(50, historicos // 100)
+    cenarios = [c for c in CENARIOS if not args.cenarios or any(f in c[0] for f in args.cenarios)]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = str(Path(pasta) / "bench.db")
+        inicio = time.perf_counter()
+        engine = criar_engine(caminho)
+        popular(engine, usuarios=usuarios, tarefas=tarefas, historicos=historicos)
+        engine.dispose()
+        tempo_semente = time.perf_counter() - inicio
+
+        stub, url_pokeapi = pokeapi_stub.iniciar(latencia_ms=args.latencia_pokeapi_ms)
+        processo, url = iniciar_api(args.app, pasta, caminho, POKEAPI_URL=url_pokeapi)
+        estado = {
+            "usuarios": usuarios, "tarefas": tarefas, "historicos": historicos,
+            "recompensas": max(1, historicos // 10),
+            "excluir_usuarios": usuarios, "excluir_tarefas": tarefas, "excluir_historicos": historicos,
+            "timeout_recompensa": args.timeout_recompensa
+        }
+        resultados = []
+        try:
+            for nome, requisicao in cenarios:
+                resultado = asyncio.run(_executar_cenario(url, nome, requisicao, estado, args))
+                print(f"{nome}: {resultado['requisicoes_por_s']} req/s, p95 {resultado['p95_ms']} ms", file=sys.stderr)
+                resultados.append(resultado)
+        finally:
+            parar_api(processo)
+            stub.shutdown()
+
+    saida = {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "usuarios": usuarios, "tarefas": tarefas, "historicos": historicos,
+            "semente_s": round(tempo_semente, 1),
+            "concorrencia": args.concorrencia, "segundos": args.segundos,
+            "latencia_pokeapi_ms": args.latencia_pokeapi_ms
+        },
+        "cenarios": resultados
+    }
+    texto = json.dumps(saida, indent=4, ensure_ascii=False)
+    if args.saida:
+        Path(args.saida).write_text(texto, encoding="utf-8")
+    else:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
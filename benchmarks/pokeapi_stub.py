@@ -0,0 +1,81 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Servidor local que imita os dois endpoints da PokéAPI usados por
+# ETL.Extract_API (/pokemon/{id} e /pokemon-species/{id}), com latência
+# configurável, para exercitar a geração de recompensas sem acesso à internet.
+# Uso: python benchmarks/pokeapi_stub.py --porta 8765 --latencia-ms 150
+# e inicie a API com POKEAPI_URL=http://127.0.0.1:8765/api/v2
+
+MAX_POKEMON = 1025
+SPRITES = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon"
+
+class _Handler(BaseHTTPRequestHandler):
+    latencia = 0.0
+    variacao = 0.0
+
+    def do_GET(self):
+        atraso = self.latencia + random.uniform(0, self.variacao)
+        if atraso:
+            time.sleep(atraso)
+        m = re.fullmatch(r"/api/v2/(pokemon|pokemon-species)/(\d+)/?", self.path)
+        if not m or not 1 <= int(m.group(2)) <= MAX_POKEMON:
+            self._responder(404, {"detail": "Not found."})
+            return
+        numero = int(m.group(2))
+        if m.group(1) == "pokemon":
+            base = f"http://{self.headers.get('Host')}/api/v2"
+            corpo = {
+                "id": numero,
+                "name": f"pokemon-{numero}",
+                "sprites": {"front_default": f"{SPRITES}/{numero}.png"},
+                "species": {"name": f"pokemon-{numero}", "url": f"{base}/pokemon-species/{numero}/"}
+            }
+        else:
+            corpo = {
+                "id": numero,
+                "flavor_text_entries": [
+                    {"flavor_text": f"Descrição do pokémon\n{numero}.", "language": {"name": "pt"}}
+                ]
+            }
+        self._responder(200, corpo)
+
+    def _responder(self, status, corpo):
+        dados = json.dumps(corpo).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, format, *args):
+        pass
+
+def iniciar(porta: int = 0, latencia_ms: float = 0, variacao_ms: float = 0):
+    # Sobe o servidor em uma thread e devolve (servidor, url base da API)
+    handler = type("Handler", (_Handler,), {"latencia": latencia_ms / 1000, "variacao": variacao_ms / 1000})
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}/api/v2"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia-ms", type=float, default=0)
+    parser.add_argument("--variacao-ms", type=float, default=0)
+    args = parser.parse_args()
+    servidor, url = iniciar(args.porta, args.latencia_ms, args.variacao_ms)
+    print(f"PokéAPI local em {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import insert
+from database import Base, criar_engine as criar_engine_db
+from models import Usuario, Tarefa, Historico, Recompensa
+
+# Popula um banco SQLite descartável para os benchmarks
+
+def criar_engine(caminho: str, perfil: str = "otimizado"):
+    engine = criar_engine_db(f"sqlite:///{caminho}", perfil)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+def popular(engine, usuarios: int, tarefas: int, historicos: int, lote: int = 10000, seed: int = 42):
+    rnd = random.Random(seed)
+    base = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Usuario), [
+            {"nome": f"Usuário {i}", "idade": rnd.randint(18, 70), "sexo": rnd.choice(["Feminino", "Masculino"]),
+             "dt_inclusao": base + timedelta(seconds=i)}
+            for i in range(1, usuarios + 1)
+        ])
+        conn.execute(insert(Tarefa), [
+            {"titulo": f"Tarefa {i}", "descricao": f"Descrição da tarefa {i} & <detalhes>", "pontos": rnd.randint(1, 20),
+             "dt_inclusao": base + timedelta(seconds=i, microseconds=rnd.randint(0, 999999))}
+            for i in range(1, tarefas + 1)
+        ])
+        for inicio in range(1, historicos + 1, lote):
+            conn.execute(insert(Historico), [
+                {"nome": f"Histórico {i}", "descricao": "Entrega realizada", "idusuario": rnd.randint(1, usuarios),
+                 "idtarefa": rnd.randint(1, tarefas), "finalizada": rnd.random() < 0.6,
+                 "dt_inclusao": base + timedelta(seconds=i, microseconds=rnd.randint(0, 999999)),
+                 "dt_exclusao": base if rnd.random() < 0.05 else None}
+                for i in range(inicio, min(inicio + lote, historicos + 1))
+            ])
+        recompensas = max(1, historicos // 10)
+        conn.execute(insert(Recompensa), [
+            {"idhist": i, "nome": f"Pokemon{i % 150}", "descricao": "Recompensa", "pontos": rnd.randint(1, 500),
+             "imagem_url": f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{i % 150 + 1}.png"}
+            for i in range(1, recompensas + 1)
+        ])
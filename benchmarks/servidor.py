@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import os
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+
+# Utilitários compartilhados pelos benchmarks HTTP: sobe a API no uvicorn em
+# uma porta livre e calcula percentis de latência. O cliente dos benchmarks HTTP
+# é o httpx, que não é dependência da API: pip install httpx
+
+# O processo do benchmark importa os módulos da API (semente -> database) e com
+# eles o logging configurado no Tarefas.log; sem isto cada requisição do cliente
+# httpx geraria linhas de DEBUG no log do projeto.
+for _nome in ("httpx", "httpcore", "asyncio"):
+    logging.getLogger(_nome).setLevel(logging.WARNING)
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def percentil(valores, p):
+    # valores em segundos, já ordenados; resultado em milissegundos
+    if not valores:
+        return None
+    return round(valores[min(len(valores) - 1, int(len(valores) * p))] * 1000, 2)
+
+def resumo_latencias(latencias, segundos, erros):
+    latencias = sorted(latencias)
+    return {
+        "requisicoes": len(latencias),
+        "requisicoes_por_s": round(len(latencias) / segundos, 1),
+        "p50_ms": percentil(latencias, 0.50),
+        "p95_ms": percentil(latencias, 0.95),
+        "p99_ms": percentil(latencias, 0.99),
+        "erros": erros
+    }
+
+async def aguardar(url, processo):
+    async with httpx.AsyncClient() as cliente:
+        for _ in range(150):
+            if processo.poll() is not None:
+                raise RuntimeError("O servidor da API terminou antes de responder")
+            try:
+                await cliente.get(url + "/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("O servidor da API não respondeu")
+
+def iniciar_api(app, pasta, caminho_db, **ambiente_extra):
+    # Inicia "uvicorn main:app" no diretório app com banco, log e cache isolados em pasta
+    porta = porta_livre()
+    ambiente = dict(
+        os.environ,
+        DB_URL=f"sqlite:///{caminho_db}",
+        LOG_ARQUIVO=str(Path(pasta) / "bench.log"),
+        LOG_LEVEL="WARNING",
+        CACHE_API_CAMINHO=str(Path(pasta) / "cache_api.db"),
+        SPRITES_CAMINHO=str(Path(pasta) / "cache_sprites"),
+        **ambiente_extra
+    )
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=app, env=ambiente
+    )
+    url = f"http://127.0.0.1:{porta}"
+    try:
+        asyncio.run(aguardar(url, processo))
+    except Exception:
+        parar_api(processo)
+        raise
+    return processo, url
+
+def parar_api(processo):
+    processo.terminate()
+    processo.wait()
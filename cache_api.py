@@ -0,0 +1,87 @@
+import json
+import sqlite3
+import threading
+import time
+import config
+from config_log import logger
+
+# Cache em disco das respostas da PokéAPI, chaveado pela URL da requisição.
+# As entradas expiram pelo TTL e, ao passar do limite de tamanho, as menos
+# acessadas recentemente são descartadas (LRU). O horário de acesso só é
+# regravado quando tem mais de "intervalo_acesso" segundos, para que um hit não
+# custe uma escrita (e um fsync) no disco.
+
+class CacheAPI:
+    def __init__(self, caminho: str, ttl: float, max_itens: int, intervalo_acesso: float = 0):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self.intervalo_acesso = intervalo_acesso
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "url TEXT PRIMARY KEY, corpo TEXT NOT NULL, "
+            "criado REAL NOT NULL, acessado REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_acessado ON cache (acessado)")
+        self._conn.commit()
+
+    def get(self, url: str):
+        agora = time.time()
+        with self._lock:
+            linha = self._conn.execute("SELECT corpo, criado, acessado FROM cache WHERE url = ?", (url,)).fetchone()
+            if linha is None:
+                self.misses += 1
+                return None
+            corpo, criado, acessado = linha
+            if agora - criado > self.ttl:
+                self._conn.execute("DELETE FROM cache WHERE url = ?", (url,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            if agora - acessado > self.intervalo_acesso:
+                self._conn.execute("UPDATE cache SET acessado = ? WHERE url = ?", (agora, url))
+                self._conn.commit()
+            self.hits += 1
+        return json.loads(corpo)
+
+    def set(self, url: str, dados):
+        agora = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (url, corpo, criado, acessado) VALUES (?, ?, ?, ?)",
+                (url, json.dumps(dados), agora, agora)
+            )
+            total = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            excesso = total - self.max_itens
+            if excesso > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE url IN (SELECT url FROM cache ORDER BY acessado LIMIT ?)",
+                    (excesso,)
+                )
+                logger.debug("Cache da API descartou %s entradas antigas", excesso)
+            self._conn.commit()
+
+    def limpar(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def estatisticas(self):
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        consultas = self.hits + self.misses
+        return {
+            "itens": total,
+            "max_itens": self.max_itens,
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": self.hits / consultas if consultas else 0.0
+        }
+
+cache = CacheAPI(config.CACHE_API_CAMINHO, config.CACHE_API_TTL, config.CACHE_API_MAX_ITENS,
+                 config.CACHE_API_INTERVALO_ACESSO)
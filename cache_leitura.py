@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+import config
+
+# Cache em memória das respostas já serializadas das consultas por id
+# (entidade, id, formato). As entradas expiram pelo TTL, as menos usadas são
+# descartadas ao passar do limite (LRU) e as rotas de escrita invalidam os ids
+# que alteram. Com CACHE_LEITURA_MAX_ITENS = 0 o cache fica desativado.
+
+FORMATOS = ("json", "xml")
+
+class CacheLeitura:
+    def __init__(self, max_itens: int, ttl: float):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self._geracao = 0
+
+    def geracao(self) -> int:
+        # Lida antes de consultar o banco: se alguma invalidação acontecer
+        # durante a consulta, o resultado (possivelmente antigo) não é guardado
+        return self._geracao
+
+    def get(self, entidade: str, id, formato: str):
+        if not self.max_itens:
+            return None
+        chave = (entidade, id, formato)
+        with self._lock:
+            entrada = self._itens.get(chave)
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._itens[chave]
+                self.misses += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return entrada[1]
+
+    def set(self, entidade: str, id, formato: str, resposta, geracao: int):
+        if not self.max_itens:
+            return
+        entrada = (time.monotonic() + self.ttl, (resposta.body, resposta.media_type, resposta.headers.get("etag")))
+        with self._lock:
+            if geracao != self._geracao:
+                return
+            self._itens[(entidade, id, formato)] = entrada
+            self._itens.move_to_end((entidade, id, formato))
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, entidade: str, *ids):
+        with self._lock:
+            self._geracao += 1
+            for id in ids:
+                for formato in FORMATOS:
+                    self._itens.pop((entidade, id, formato), None)
+
+    def limpar(self):
+        with self._lock:
+            self._geracao += 1
+            self._itens.clear()
+
+    def estatisticas(self):
+        consultas = self.hits + self.misses
+        return {
+            "itens": len(self._itens),
+            "max_itens": self.max_itens,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": self.hits / consultas if consultas else 0.0
+        }
+
+cache = CacheLeitura(config.CACHE_LEITURA_MAX_ITENS, config.CACHE_LEITURA_TTL)
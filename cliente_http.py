@@ -0,0 +1,80 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import config
+
+# Cliente HTTP compartilhado: mantém as conexões abertas (keep-alive) em um pool
+# por host, evitando um novo handshake TCP+TLS a cada requisição.
+
+class _AdapterComTimeout(HTTPAdapter):
+    def __init__(self, timeout, *args, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+_lock = threading.Lock()
+_sessao = None
+
+def _nova_sessao():
+    sessao = requests.Session()
+    adapter = _AdapterComTimeout(
+        timeout=(config.HTTP_TIMEOUT_CONEXAO, config.HTTP_TIMEOUT_LEITURA),
+        pool_connections=config.HTTP_POOL_HOSTS,
+        pool_maxsize=config.HTTP_POOL_POR_HOST,
+        pool_block=True,
+        max_retries=Retry(
+            total=config.HTTP_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            raise_on_status=False
+        )
+    )
+    sessao.mount("https://", adapter)
+    sessao.mount("http://", adapter)
+    return sessao
+
+def sessao() -> requests.Session:
+    global _sessao
+    if _sessao is None:
+        with _lock:
+            if _sessao is None:
+                _sessao = _nova_sessao()
+    return _sessao
+
+def paginas(url: str, headers=None):
+    # Percorre uma listagem paginada da API seguindo o X-Next-Cursor até a
+    # última página (ou até uma resposta de erro, que também é devolvida)
+    params = None
+    while True:
+        resposta = sessao().get(url, headers=headers, params=params)
+        yield resposta
+        cursor = resposta.headers.get("X-Next-Cursor")
+        if resposta.status_code != 200 or not cursor:
+            return
+        params = {"after_id": cursor}
+
+def juntar_paginas(respostas, tipo: str):
+    # JSON: uma única lista com os itens de todas as páginas.
+    # XML: um único documento <response> com os <item> de todas as páginas.
+    if tipo.lower() == "json":
+        itens = []
+        for resposta in respostas:
+            itens.extend(resposta.json())
+        return itens
+    abre, fecha = "<response>", "</response>"
+    textos = [resposta.text for resposta in respostas]
+    partes = [texto[texto.index(abre) + len(abre):texto.rindex(fecha)] for texto in textos[1:]]
+    return textos[0][:textos[0].rindex(fecha)] + "".join(partes) + fecha
+
+def fechar():
+    global _sessao
+    with _lock:
+        if _sessao is not None:
+            _sessao.close()
+            _sessao = None
@@ -0,0 +1,84 @@
+import zlib
+from functools import lru_cache
+from typing import Optional
+import config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compressão das respostas negociada pelo Accept-Encoding. gzip e deflate usam
+# o zlib da biblioteca padrão; br e zstd entram apenas com os pacotes brotli e
+# zstandard instalados. Cada compressor aceita o corpo em partes, para servir
+# também as respostas em streaming.
+
+TIPOS_COMPRESSIVEIS = ("application/json", "application/xml", "application/x-ndjson", "text/")
+
+class _Zlib:
+    def __init__(self, wbits: int):
+        self._obj = zlib.compressobj(config.COMPRESSAO_NIVEL, zlib.DEFLATED, wbits)
+
+    def parte(self, dados: bytes, final: bool) -> bytes:
+        # Nas partes intermediárias o Z_SYNC_FLUSH entrega ao cliente tudo o que já foi lido
+        return self._obj.compress(dados) + self._obj.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class _Brotli:
+    def __init__(self):
+        self._obj = brotli.Compressor(quality=config.COMPRESSAO_NIVEL_BR)
+
+    def parte(self, dados: bytes, final: bool) -> bytes:
+        return self._obj.process(dados) + (self._obj.finish() if final else self._obj.flush())
+
+class _Zstd:
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=config.COMPRESSAO_NIVEL_ZSTD).compressobj()
+
+    def parte(self, dados: bytes, final: bool) -> bytes:
+        modo = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._obj.compress(dados) + self._obj.flush(modo)
+
+COMPRESSORES = {
+    "gzip": lambda: _Zlib(16 + zlib.MAX_WBITS),
+    "deflate": lambda: _Zlib(zlib.MAX_WBITS),
+}
+if brotli is not None:
+    COMPRESSORES["br"] = _Brotli
+if zstandard is not None:
+    COMPRESSORES["zstd"] = _Zstd
+
+# Ordem de preferência do servidor quando o cliente aceita mais de um com o mesmo peso
+DISPONIVEIS = [nome for nome in config.COMPRESSAO_ALGORITMOS if nome in COMPRESSORES]
+
+@lru_cache(maxsize=256)
+def escolher(accept_encoding: str) -> Optional[str]:
+    pesos = {}
+    for parte in accept_encoding.lower().split(","):
+        nome, _, parametros = parte.partition(";")
+        peso = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                peso = float(parametros[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nome.strip()] = peso
+
+    curinga = pesos.get("*", 0.0)
+    melhor, melhor_peso = None, 0.0
+    for nome in DISPONIVEIS:
+        peso = pesos.get(nome, curinga)
+        if peso > melhor_peso:
+            melhor, melhor_peso = nome, peso
+    return melhor
+
+def compressivel(content_type: str) -> bool:
+    return content_type.startswith(TIPOS_COMPRESSIVEIS)
+
+def compressor(nome: str):
+    return COMPRESSORES[nome]()
@@ -0,0 +1,83 @@
+import os
+
+# Logs
+LOG_ARQUIVO = os.getenv("LOG_ARQUIVO", "Tarefas.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+LOG_AMOSTRA_SESSAO = int(os.getenv("LOG_AMOSTRA_SESSAO", "100"))
+LOG_FORMATO = os.getenv("LOG_FORMATO", "texto")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_ROTACAO_SEGUNDOS = int(os.getenv("LOG_ROTACAO_SEGUNDOS", "0"))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "20"))
+LOG_COMPRIMIR = os.getenv("LOG_COMPRIMIR", "1") == "1"
+
+# Fila de jobs em segundo plano (geração de recompensas)
+FILA_WORKERS = int(os.getenv("FILA_WORKERS", "2"))
+FILA_MAX_TENTATIVAS = int(os.getenv("FILA_MAX_TENTATIVAS", "5"))
+FILA_BACKOFF_BASE = float(os.getenv("FILA_BACKOFF_BASE", "2"))
+FILA_BACKOFF_MAX = float(os.getenv("FILA_BACKOFF_MAX", "300"))
+FILA_INTERVALO = float(os.getenv("FILA_INTERVALO", "1"))
+FILA_LEASE = float(os.getenv("FILA_LEASE", "120"))
+
+# PokéAPI (pode apontar para um servidor local, ex.: benchmarks/pokeapi_stub.py)
+POKEAPI_URL = os.getenv("POKEAPI_URL", "https://pokeapi.co/api/v2").rstrip("/")
+
+# Cache em disco das respostas da PokéAPI
+CACHE_API_CAMINHO = os.getenv("CACHE_API_CAMINHO", "cache_api.db")
+CACHE_API_TTL = float(os.getenv("CACHE_API_TTL", str(30 * 24 * 3600)))
+CACHE_API_MAX_ITENS = int(os.getenv("CACHE_API_MAX_ITENS", "5000"))
+CACHE_API_INTERVALO_ACESSO = float(os.getenv("CACHE_API_INTERVALO_ACESSO", "300"))
+
+# Cache em memória das consultas por id (0 desativa)
+CACHE_LEITURA_MAX_ITENS = int(os.getenv("CACHE_LEITURA_MAX_ITENS", "10000"))
+CACHE_LEITURA_TTL = float(os.getenv("CACHE_LEITURA_TTL", "60"))
+
+# Cliente HTTP compartilhado (pool de conexões keep-alive)
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))
+HTTP_POOL_POR_HOST = int(os.getenv("HTTP_POOL_POR_HOST", "10"))
+HTTP_TIMEOUT_CONEXAO = float(os.getenv("HTTP_TIMEOUT_CONEXAO", "3"))
+HTTP_TIMEOUT_LEITURA = float(os.getenv("HTTP_TIMEOUT_LEITURA", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+
+# Cache em disco dos sprites do gráfico de Pokémons
+SPRITES_CAMINHO = os.getenv("SPRITES_CAMINHO", "cache_sprites")
+SPRITES_WORKERS = int(os.getenv("SPRITES_WORKERS", "8"))
+
+# Paginação das rotas de listagem
+PAGINACAO_PADRAO = int(os.getenv("PAGINACAO_PADRAO", "100"))
+PAGINACAO_MAX = int(os.getenv("PAGINACAO_MAX", "1000"))
+
+# Respostas em streaming
+STREAM_LOTE = int(os.getenv("STREAM_LOTE", "500"))
+
+# Compressão das respostas (Accept-Encoding). br e zstd dependem dos pacotes
+# brotli e zstandard; respostas menores que COMPRESSAO_MIN_BYTES seguem sem compressão
+COMPRESSAO_ALGORITMOS = [a.strip() for a in os.getenv("COMPRESSAO_ALGORITMOS", "zstd,br,gzip,deflate").split(",") if a.strip()]
+COMPRESSAO_MIN_BYTES = int(os.getenv("COMPRESSAO_MIN_BYTES", "1024"))
+COMPRESSAO_NIVEL = int(os.getenv("COMPRESSAO_NIVEL", "6"))
+COMPRESSAO_NIVEL_BR = int(os.getenv("COMPRESSAO_NIVEL_BR", "4"))
+COMPRESSAO_NIVEL_ZSTD = int(os.getenv("COMPRESSAO_NIVEL_ZSTD", "3"))
+
+# Operações em lote
+BULK_MAX = int(os.getenv("BULK_MAX", "5000"))
+
+# Banco de dados (SQLite)
+DB_URL = os.getenv("DB_URL", "sqlite:///./tarefas.db")
+DB_PERFIL = os.getenv("DB_PERFIL", "otimizado")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "-64000"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_TEMP_STORE = os.getenv("DB_TEMP_STORE", "MEMORY")
+DB_BUSY_TIMEOUT = int(os.getenv("DB_BUSY_TIMEOUT", "5000"))
+
+# Instrumentação das consultas SQL por requisição (cabeçalhos X-DB-*, consultas
+# lentas e repetidas)
+DB_INSTRUMENTACAO = os.getenv("DB_INSTRUMENTACAO", "1") == "1"
+DB_CONSULTA_LENTA_MS = float(os.getenv("DB_CONSULTA_LENTA_MS", "100"))
+DB_REPETICOES_N1 = int(os.getenv("DB_REPETICOES_N1", "5"))
+
+# Dashboard: tempo máximo (s) dos dados em cache, mesmo sem alterações nas tabelas
+DASH_CACHE_TTL = int(os.getenv("DASH_CACHE_TTL", "300"))
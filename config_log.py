@@ -1,9 +1,196 @@
+import atexit
+import glob
+import gzip
+import json
 import logging
+import os
+import queue
+import re
+import shutil
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, BaseRotatingHandler
+import config
+
+# Os registros são apenas enfileirados na thread da requisição; a formatação e
+# a escrita no arquivo acontecem na thread do QueueListener.
+
+FORMATO_TEXTO = '%(asctime)s - %(levelname)s - %(message)s'
+FORMATO_DATA_ARQUIVO = "%Y%m%d-%H%M%S"
+
+# Escopo ASGI da requisição em andamento, definido pelo middleware de contexto
+contexto_requisicao = ContextVar("contexto_requisicao", default=None)
+
+class _QueueHandlerLazy(QueueHandler):
+    # A fila é local ao processo, então o registro segue sem ser formatado aqui
+    def prepare(self, record):
+        return record
+
+class _FiltroContexto(logging.Filter):
+    # Roda na thread de origem: copia a rota e o id da entidade para o registro
+    def filter(self, record):
+        scope = contexto_requisicao.get()
+        if scope is not None:
+            rota = scope.get("route")
+            record.rota = getattr(rota, "path", None) or scope.get("path")
+            if getattr(record, "entidade_id", None) is None:
+                entidade = scope.get("path_params", {}).get("id")
+                record.entidade_id = int(entidade) if entidade and entidade.isdigit() else _id_query(scope)
+        return True
+
+def _id_query(scope):
+    m = re.search(rb"(?:^|&)id=(\d+)", scope.get("query_string", b""))
+    return int(m.group(1)) if m else None
+
+class FormatoJSON(logging.Formatter):
+    # Uma linha JSON por registro, para leitura sem regex
+    def format(self, record):
+        dados = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "route": getattr(record, "rota", None),
+            "entity_id": getattr(record, "entidade_id", None),
+            "duration_ms": getattr(record, "duracao_ms", None)
+        }
+        if record.exc_info:
+            dados["exc"] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+class ArquivoRotativo(BaseRotatingHandler):
+    # Rotaciona por tamanho e/ou tempo. O arquivo rotacionado recebe no nome o
+    # intervalo de tempo que contém (Tarefas.log.<inicio>_<fim>[.gz]), o que
+    # permite aos leitores ignorar arquivos inteiros fora do período desejado.
+    def __init__(self, filename, max_bytes=0, intervalo=0, backups=0, comprimir=True, encoding=None):
+        super().__init__(filename, "a", encoding=encoding, delay=True)
+        self.max_bytes = max_bytes
+        self.intervalo = intervalo
+        self.backups = backups
+        self.comprimir = comprimir
+        self.inicio = _inicio_arquivo(self.baseFilename)
+        self.ultimo = self.inicio
+
+    def shouldRollover(self, record):
+        if self.inicio is None:
+            return False
+        if self.intervalo and record.created >= self.inicio + self.intervalo:
+            return True
+        if self.max_bytes:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes:
+                return True
+        return False
+
+    def emit(self, record):
+        super().emit(record)
+        if self.inicio is None:
+            self.inicio = record.created
+        self.ultimo = record.created
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        inicio = datetime.fromtimestamp(self.inicio).strftime(FORMATO_DATA_ARQUIVO)
+        fim = datetime.fromtimestamp(self.ultimo).strftime(FORMATO_DATA_ARQUIVO)
+        destino = _destino_livre(f"{self.baseFilename}.{inicio}_{fim}")
+        if os.path.exists(self.baseFilename):
+            if self.comprimir:
+                with open(self.baseFilename, "rb") as origem, gzip.open(destino + ".gz", "xb") as saida:
+                    shutil.copyfileobj(origem, saida)
+                os.remove(self.baseFilename)
+            else:
+                os.rename(self.baseFilename, destino)
+        if self.backups:
+            for antigo in arquivos_rotacionados(self.baseFilename)[:-self.backups]:
+                os.remove(antigo[0])
+        self.inicio = None
+
+def _destino_livre(destino):
+    # Duas rotações no mesmo segundo gerariam o mesmo nome: a partir da segunda
+    # o nome recebe uma sequência (Tarefas.log.<inicio>_<fim>-1.gz)
+    candidato, sequencia = destino, 0
+    while os.path.exists(candidato) or os.path.exists(candidato + ".gz"):
+        sequencia += 1
+        candidato = f"{destino}-{sequencia}"
+    return candidato
+
+def _data_arquivo(texto):
+    return datetime.strptime(texto, FORMATO_DATA_ARQUIVO).timestamp()
+
+def _inicio_arquivo(caminho):
+    if not os.path.exists(caminho) or os.path.getsize(caminho) == 0:
+        return None
+    with open(caminho, "r", encoding="latin-1") as f:
+        primeira = f.readline()
+    m = re.match(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})|\{"ts": "([^"]+)"', primeira)
+    if m and m.group(1):
+        return datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S").timestamp()
+    if m and m.group(2):
+        return datetime.fromisoformat(m.group(2)).timestamp()
+    return os.path.getmtime(caminho)
+
+def arquivos_rotacionados(caminho):
+    # Lista (arquivo, inicio, fim) dos logs rotacionados, do mais antigo ao mais recente
+    padrao = re.compile(re.escape(os.path.basename(caminho)) + r"\.(\d{8}-\d{6})_(\d{8}-\d{6})(?:-(\d+))?(\.gz)?$")
+    arquivos = []
+    for arquivo in glob.glob(glob.escape(caminho) + ".*_*"):
+        m = padrao.search(os.path.basename(arquivo))
+        if m:
+            ordem = (_data_arquivo(m.group(1)), _data_arquivo(m.group(2)), int(m.group(3) or 0))
+            arquivos.append((ordem, (arquivo, ordem[0], ordem[1])))
+    return [arquivo for _, arquivo in sorted(arquivos)]
+
+def arquivos_log(caminho, inicio=None, fim=None):
+    # Arquivos (rotacionados e atual) que podem conter registros entre inicio e fim
+    arquivos = [
+        arquivo for arquivo, a_inicio, a_fim in arquivos_rotacionados(caminho)
+        if (inicio is None or a_fim + 1 >= inicio) and (fim is None or a_inicio <= fim)
+    ]
+    if os.path.exists(caminho):
+        arquivos.append(caminho)
+    return arquivos
+
+def abrir_log(caminho, encoding="latin-1"):
+    if caminho.endswith(".gz"):
+        return gzip.open(caminho, "rt", encoding=encoding)
+    return open(caminho, "r", encoding=encoding)
+
+_fila = queue.SimpleQueue()
+
+_arquivo = ArquivoRotativo(
+    config.LOG_ARQUIVO,
+    max_bytes=config.LOG_MAX_BYTES,
+    intervalo=config.LOG_ROTACAO_SEGUNDOS,
+    backups=config.LOG_BACKUPS,
+    comprimir=config.LOG_COMPRIMIR
+)
+_arquivo.setFormatter(FormatoJSON() if config.LOG_FORMATO == "json" else logging.Formatter(FORMATO_TEXTO))
+
+_listener = QueueListener(_fila, _arquivo, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+
+_handler_fila = _QueueHandlerLazy(_fila)
+_handler_fila.addFilter(_FiltroContexto())
 
 logging.basicConfig(
-    filename='Tarefas.log',
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    level=config.LOG_LEVEL,
+    handlers=[_handler_fila],
 )
 
-logger = logging.getLogger("Tarefas_logger")
\ No newline at end of file
+logger = logging.getLogger("Tarefas_logger")
+
+NIVEIS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+def nivel_atual() -> str:
+    return logging.getLevelName(logging.getLogger().level)
+
+def definir_nivel(nivel: str):
+    nivel = nivel.upper()
+    if nivel not in NIVEIS:
+        raise ValueError(f"Nível de log inválido: {nivel}")
+    logging.getLogger().setLevel(nivel)
+    logger.warning("Nível de log alterado para %s", nivel)
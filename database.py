@@ -1,23 +1,107 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from config_log import logger
+import config
+import instrumentacao_sql
+import itertools
+import logging
 
-url_db = "sqlite:///./tarefas.db"
+url_db = config.DB_URL
 
-engine = create_engine(
-    url_db,
-    connect_args={"check_same_thread": False}
-    )
+# Perfis de engine: "padrao" mantém os defaults do SQLite e "otimizado" aplica
+# os PRAGMAs abaixo em cada nova conexão (WAL permite leitores em paralelo com
+# o escritor e o busy_timeout evita o erro "database is locked" em disputas curtas)
+def pragmas_perfil(perfil: str):
+    if perfil == "padrao":
+        return {}
+    return {
+        "journal_mode": config.DB_JOURNAL_MODE,
+        "synchronous": config.DB_SYNCHRONOUS,
+        "cache_size": config.DB_CACHE_SIZE,
+        "mmap_size": config.DB_MMAP_SIZE,
+        "temp_store": config.DB_TEMP_STORE,
+        "busy_timeout": config.DB_BUSY_TIMEOUT
+    }
+
+def criar_engine(url: str, perfil: str = config.DB_PERFIL):
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT
+        )
+    _registrar_pragmas(engine, perfil)
+    instrumentacao_sql.registrar(engine)
+    return engine
+
+def _registrar_pragmas(engine, perfil: str):
+    pragmas = pragmas_perfil(perfil)
+
+    if pragmas:
+        @event.listens_for(engine, "connect")
+        def aplicar_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for nome, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nome}={valor}")
+            cursor.close()
+
+def url_async(url: str) -> str:
+    return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+# O aiosqlite registra em DEBUG cada operação enviada à sua thread; com o nível
+# raiz em DEBUG isso gravaria várias linhas por requisição no Tarefas.log
+logging.getLogger("aiosqlite").setLevel(logging.WARNING)
+
+# Engine assíncrona (aiosqlite) usada pelas rotas "async def": as consultas não
+# ocupam as threads do threadpool do Starlette enquanto aguardam o banco
+def criar_engine_async(url: str, perfil: str = config.DB_PERFIL):
+    engine = create_async_engine(
+        url_async(url),
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT
+        )
+    _registrar_pragmas(engine.sync_engine, perfil)
+    instrumentacao_sql.registrar(engine.sync_engine)
+    return engine
+
+engine = criar_engine(url_db)
 
 SessionLocal = sessionmaker(bind=engine)
 
+async_engine = criar_engine_async(url_db)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine)
+
 Base = declarative_base()
 
+_sessoes = itertools.count()
+
+def _registrar_sessao():
+    # As mensagens de sessão são amostradas: apenas 1 a cada LOG_AMOSTRA_SESSAO sessões é registrada
+    return next(_sessoes) % config.LOG_AMOSTRA_SESSAO == 0
+
 def get_db():
     db = SessionLocal()
+    registrar = _registrar_sessao()
+    try:
+        if registrar:
+            logger.info("A sessão com o banco de dados foi inicializada com suceso")
+        yield db
+    finally:
+        if registrar:
+            logger.info('A sessão com o banco de dados foi finalizada com sucesso')
+        db.close()
+
+async def get_async_db():
+    db = AsyncSessionLocal()
+    registrar = _registrar_sessao()
     try:
-        logger.info("A sessão com o banco de dados foi inicializada com suceso")
+        if registrar:
+            logger.info("A sessão com o banco de dados foi inicializada com suceso")
         yield db
     finally:
-        logger.info('A sessão com o banco de dados foi finalizada com sucesso')
-        db.close()
\ No newline at end of file
+        if registrar:
+            logger.info('A sessão com o banco de dados foi finalizada com sucesso')
+        await db.close()
@@ -0,0 +1,134 @@
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import Job
+from config_log import logger
+import config
+import ETL
+
+# Fila persistente de jobs: os jobs ficam na tabela "job" e são consumidos por
+# threads de background, permitindo que as rotas de histórico respondam sem
+# esperar a PokéAPI.
+
+TIPO_RECOMPENSA = "recompensa"
+
+class JobInvalido(Exception):
+    pass
+
+# Falhas que não mudam com novas tentativas: o job falha de imediato
+ERROS_PERMANENTES = (JobInvalido, ETL.RecompensaIndisponivel)
+
+_parar = threading.Event()
+_novo_job = threading.Event()
+_workers = []
+
+def enfileirar_recom(db: Session, idhist: int, pontos) -> Job:
+    # Adiciona o job na sessão do chamador, que faz o commit junto com o histórico
+    job = Job(
+        tipo=TIPO_RECOMPENSA,
+        idhist=idhist,
+        pontos=pontos,
+        status="pendente",
+        tentativas=0,
+        max_tentativas=config.FILA_MAX_TENTATIVAS,
+        proxima_execucao=datetime.utcnow()
+    )
+    db.add(job)
+    logger.info("Job de recompensa enfileirado para o histórico %s", idhist)
+    return job
+
+def notificar():
+    _novo_job.set()
+
+def _reservar(db: Session):
+    agora = datetime.utcnow()
+    disponivel = or_(
+        and_(Job.status == "pendente", Job.proxima_execucao <= agora),
+        and_(Job.status == "executando", Job.bloqueado_ate < agora)
+    )
+    job = db.query(Job).filter(disponivel).order_by(Job.idjob).first()
+    if not job:
+        return None
+
+    # O UPDATE condicional garante que apenas um worker reserve o job
+    reservado = db.query(Job).filter(Job.idjob == job.idjob, disponivel).update(
+        {
+            "status": "executando",
+            "tentativas": Job.tentativas + 1,
+            "bloqueado_ate": agora + timedelta(seconds=config.FILA_LEASE)
+        },
+        synchronize_session=False
+    )
+    db.commit()
+    if not reservado:
+        return None
+    db.refresh(job)
+    return job
+
+def _backoff(tentativas: int) -> float:
+    return min(config.FILA_BACKOFF_BASE ** tentativas, config.FILA_BACKOFF_MAX)
+
+def _executar(db: Session, job: Job):
+    try:
+        if job.tipo == TIPO_RECOMPENSA:
+            ETL.criar_recom(pontos=job.pontos, db=db, idhist=job.idhist)
+        else:
+            raise JobInvalido(f"Tipo de job desconhecido: {job.tipo}")
+    except Exception as e:
+        db.rollback()
+        job = db.get(Job, job.idjob)
+        job.erro = str(e)
+        job.bloqueado_ate = None
+        if isinstance(e, ERROS_PERMANENTES):
+            job.status = "falhou"
+            logger.error("Job %s falhou sem novas tentativas (erro permanente): %s", job.idjob, e)
+        elif job.tentativas >= job.max_tentativas:
+            job.status = "falhou"
+            logger.error("Job %s falhou definitivamente após %s tentativas: %s", job.idjob, job.tentativas, e)
+        else:
+            espera = _backoff(job.tentativas)
+            job.status = "pendente"
+            job.proxima_execucao = datetime.utcnow() + timedelta(seconds=espera)
+            logger.warning("Job %s falhou na tentativa %s, nova tentativa em %ss: %s", job.idjob, job.tentativas, espera, e)
+        db.commit()
+        return
+
+    job.status = "concluido"
+    job.erro = None
+    job.bloqueado_ate = None
+    db.commit()
+    logger.info("Job %s concluído com sucesso", job.idjob)
+
+def _loop():
+    while not _parar.is_set():
+        db = SessionLocal()
+        try:
+            job = _reservar(db)
+            if job:
+                _executar(db, job)
+                continue
+        except Exception as e:
+            db.rollback()
+            logger.error("Erro no worker da fila: %s", e)
+        finally:
+            db.close()
+        _novo_job.wait(config.FILA_INTERVALO)
+        _novo_job.clear()
+
+def iniciar():
+    _parar.clear()
+    for i in range(config.FILA_WORKERS):
+        worker = threading.Thread(target=_loop, name=f"fila-worker-{i}", daemon=True)
+        worker.start()
+        _workers.append(worker)
+    logger.info("Fila iniciada com %s workers", config.FILA_WORKERS)
+
+def parar():
+    _parar.set()
+    _novo_job.set()
+    for worker in _workers:
+        worker.join(timeout=5)
+    _workers.clear()
+    logger.info("Fila finalizada")
@@ -0,0 +1,76 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from sqlalchemy import event
+from config_log import logger
+import config
+
+# Contagem das consultas SQL por requisição a partir dos eventos da engine.
+# O middleware abre um acumulador no contexto da requisição; os eventos somam
+# a quantidade, o tempo e o texto de cada comando (que já vem com os parâmetros
+# como "?", então comandos iguais têm o mesmo formato). Consultas fora de uma
+# requisição (fila, dashboard) só passam pelo log de consultas lentas.
+
+_consultas = ContextVar("consultas_requisicao", default=None)
+
+PADRAO_LISTA_IN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+PADRAO_ESPACOS = re.compile(r"\s+")
+
+class ConsultasRequisicao:
+    __slots__ = ("quantidade", "tempo", "comandos")
+
+    def __init__(self):
+        self.quantidade = 0
+        self.tempo = 0.0
+        self.comandos = Counter()
+
+    def repetidas(self, minimo: int = config.DB_REPETICOES_N1) -> dict:
+        # Agrupa pelo formato do comando (listas do IN com tamanhos diferentes
+        # contam como o mesmo comando) e devolve os executados "minimo" vezes ou mais
+        formatos = Counter()
+        for comando, quantidade in self.comandos.items():
+            formatos[formato(comando)] += quantidade
+        return {comando: quantidade for comando, quantidade in formatos.items() if quantidade >= minimo}
+
+def formato(comando: str) -> str:
+    return PADRAO_LISTA_IN.sub("(?, ...)", PADRAO_ESPACOS.sub(" ", comando).strip())
+
+def iniciar():
+    return _consultas.set(ConsultasRequisicao())
+
+def atual():
+    return _consultas.get()
+
+def finalizar(token):
+    _consultas.reset(token)
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    duracao = time.perf_counter() - conn.info["inicio_consulta"].pop()
+    consultas = _consultas.get()
+    if consultas is not None:
+        consultas.quantidade += 1
+        consultas.tempo += duracao
+        consultas.comandos[statement] += 1
+    if config.DB_CONSULTA_LENTA_MS and duracao * 1000 >= config.DB_CONSULTA_LENTA_MS:
+        logger.warning("Consulta lenta (%.1f ms): %s | parâmetros: %.1000r",
+                       duracao * 1000, PADRAO_ESPACOS.sub(" ", statement).strip(), parameters)
+
+def _erro(contexto):
+    # Um comando que falhou não passa pelo after_cursor_execute. O contexto do
+    # handle_error não tem o atributo "cursor" no SQLAlchemy 2, então a pilha é
+    # encontrada só pela conexão (vazia quando o erro veio antes do comando)
+    if contexto.connection is not None:
+        inicios = contexto.connection.info.get("inicio_consulta")
+        if inicios:
+            inicios.pop()
+
+def registrar(engine):
+    if not config.DB_INSTRUMENTACAO:
+        return
+    event.listen(engine, "before_cursor_execute", _antes)
+    event.listen(engine, "after_cursor_execute", _depois)
+    event.listen(engine, "handle_error", _erro)
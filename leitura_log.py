@@ -0,0 +1,170 @@
+import gzip
+import json
+from collections import deque
+from datetime import datetime
+import os
+import re
+import threading
+import pandas as pd
+import config
+from config_log import arquivos_rotacionados, arquivos_log, abrir_log
+
+# Agregação incremental do arquivo de log para o dashboard: as contagens por
+# hora e nível ficam num arquivo auxiliar junto com o offset já lido e o inode
+# do arquivo, e cada atualização lê apenas os bytes novos.
+
+NIVEIS = ["INFO", "DEBUG", "WARNING", "ERROR"]
+
+PADRAO_TEXTO = re.compile(rb"^(\d{4}-\d{2}-\d{2} \d{2}):\d{2}:\d{2},\d+\s-\s(\w+)")
+PADRAO_JSON = re.compile(rb'^\{"ts": "(\d{4}-\d{2}-\d{2})T(\d{2}):[^"]*", "level": "(\w+)"')
+
+# Data/hora e nível de cada registro, para os filtros do relatório em PDF
+PADRAO_REGISTRO = re.compile(r'^(?:\{"ts": ")?(\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2})[^"]*?(?:", "level": "| - )(\w+)')
+
+_lock = threading.Lock()
+
+def caminho_agregado(caminho):
+    return caminho + ".agregado.json"
+
+def _nomes_rotacionados(caminho):
+    return [os.path.basename(nome) for nome, _, _ in arquivos_rotacionados(caminho)]
+
+def _estado_vazio():
+    return {"inode": None, "offset": 0, "rotacionados": [], "contagens": {}}
+
+def _carregar_estado(caminho):
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return _estado_vazio()
+
+def _salvar_estado(caminho, estado):
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    os.replace(temporario, caminho)
+
+def _contar(contagens, linha):
+    m = PADRAO_TEXTO.match(linha)
+    if m:
+        hora, nivel = m.group(1), m.group(2)
+    else:
+        m = PADRAO_JSON.match(linha)
+        if not m:
+            return
+        hora, nivel = m.group(1) + b" " + m.group(2), m.group(3)
+    hora = hora.decode("latin-1")
+    nivel = nivel.decode("latin-1")
+    if hora not in contagens:
+        contagens[hora] = dict.fromkeys(NIVEIS, 0)
+    if nivel in contagens[hora]:
+        contagens[hora][nivel] += 1
+
+def _ler(arquivo, offset, contagens, apenas_completas=True):
+    # Conta as linhas a partir de offset e devolve a posição do fim da última
+    # linha completa (uma linha ainda sendo escrita fica para a próxima leitura)
+    arquivo.seek(offset)
+    for linha in arquivo:
+        if apenas_completas and not linha.endswith(b"\n"):
+            break
+        _contar(contagens, linha)
+        offset += len(linha)
+    return offset
+
+def _abrir(caminho):
+    if caminho.endswith(".gz"):
+        return gzip.open(caminho, "rb")
+    return open(caminho, "rb")
+
+def _ler_rotacionados(caminho, estado):
+    # Após uma rotação, termina de ler o arquivo antigo (agora renomeado) a
+    # partir do offset salvo e lê por inteiro os que foram rotacionados depois
+    ja_lidos = set(estado["rotacionados"])
+    novos = [nome for nome, _, _ in arquivos_rotacionados(caminho) if os.path.basename(nome) not in ja_lidos]
+    for i, nome in enumerate(novos):
+        with _abrir(nome) as f:
+            _ler(f, estado["offset"] if i == 0 else 0, estado["contagens"], apenas_completas=False)
+    estado["rotacionados"] = _nomes_rotacionados(caminho)
+    estado["offset"] = 0
+
+def atualizar(caminho=config.LOG_ARQUIVO) -> dict:
+    agregado = caminho_agregado(caminho)
+    with _lock:
+        estado = _carregar_estado(agregado)
+        if not os.path.exists(caminho):
+            return estado["contagens"]
+
+        info = os.stat(caminho)
+        if estado["inode"] is None:
+            # Primeira execução: o histórico já rotacionado não é contado,
+            # assim como na leitura completa do arquivo atual
+            estado["rotacionados"] = _nomes_rotacionados(caminho)
+        elif estado["inode"] != info.st_ino or set(_nomes_rotacionados(caminho)) - set(estado["rotacionados"]):
+            # O inode pode ser reaproveitado pelo novo arquivo, então um arquivo
+            # rotacionado ainda não visto também indica rotação
+            _ler_rotacionados(caminho, estado)
+        elif info.st_size < estado["offset"]:
+            # Arquivo truncado no lugar: as contagens antigas não valem mais
+            estado = _estado_vazio()
+            estado["rotacionados"] = _nomes_rotacionados(caminho)
+
+        if info.st_size > estado["offset"] or estado["inode"] != info.st_ino or estado["offset"] == 0:
+            with open(caminho, "rb") as f:
+                estado["offset"] = _ler(f, estado["offset"], estado["contagens"])
+            estado["inode"] = info.st_ino
+            _salvar_estado(agregado, estado)
+        return estado["contagens"]
+
+def contagens_df(contagens) -> pd.DataFrame:
+    df = pd.DataFrame.from_dict(contagens, orient="index").sort_index()
+    df.index.name = "datetime_hour"
+    return df
+
+def carregar(caminho=config.LOG_ARQUIVO) -> pd.DataFrame:
+    # Mesmo DataFrame da leitura completa: uma linha por hora e uma coluna por nível
+    return contagens_df(atualizar(caminho))
+
+def reiniciar(caminho=config.LOG_ARQUIVO):
+    with _lock:
+        if os.path.exists(caminho_agregado(caminho)):
+            os.remove(caminho_agregado(caminho))
+
+def _filtrar(linhas, inicio, fim, niveis):
+    # Linhas sem data/hora (ex.: traceback) seguem a decisão do registro anterior
+    manter = False
+    for linha in linhas:
+        m = PADRAO_REGISTRO.match(linha)
+        if m:
+            data = m.group(1).replace("T", " ")
+            manter = (
+                (inicio is None or data >= inicio)
+                and (fim is None or data <= fim)
+                and (not niveis or m.group(2) in niveis)
+            )
+        if manter:
+            yield linha
+
+def linhas_filtradas(caminho=config.LOG_ARQUIVO, inicio: datetime = None, fim: datetime = None, niveis=None, ultimas: int = None):
+    # Lê os arquivos de log (rotacionados e atual) em streaming, pulando os que
+    # estão fora do intervalo. Com "ultimas", apenas as N últimas linhas ficam em memória.
+    texto_inicio = inicio.strftime("%Y-%m-%d %H:%M:%S") if inicio else None
+    texto_fim = fim.strftime("%Y-%m-%d %H:%M:%S") if fim else None
+
+    def todas():
+        arquivos = arquivos_log(
+            caminho,
+            inicio.timestamp() if inicio else None,
+            fim.timestamp() if fim else None
+        )
+        for arquivo in arquivos:
+            with abrir_log(arquivo) as f:
+                yield from _filtrar(f, texto_inicio, texto_fim, set(niveis or ()))
+
+    if ultimas:
+        return iter(deque(todas(), maxlen=ultimas))
+    return todas()
+
+if __name__ == "__main__":
+    reiniciar()
+    print(carregar())
@@ -0,0 +1,105 @@
+from datetime import datetime
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from sqlalchemy import select, insert, update
+from sqlalchemy.orm import Session
+from models import Tarefa
+import config
+
+# Operações em lote (bulk): cada item é validado individualmente com os schemas
+# existentes e os válidos são gravados em uma única transação. Os erros são
+# devolvidos por item, identificados pela posição na lista recebida.
+
+def verificar_tamanho(itens):
+    if not isinstance(itens, list) or not itens:
+        raise HTTPException(status_code=400, detail="Envie uma lista com ao menos um item")
+    if len(itens) > config.BULK_MAX:
+        raise HTTPException(status_code=400, detail=f"O lote excede o limite de {config.BULK_MAX} itens")
+
+def erro(indice: int, mensagem, id=None):
+    item = {"indice": indice, "erro": mensagem}
+    if id is not None:
+        item["id"] = id
+    return item
+
+def resultado(chave: str, ids, erros):
+    return {chave: ids, "erros": sorted(erros, key=lambda e: e["indice"])}
+
+def colunas_obrigatorias(model):
+    return {coluna.key for coluna in model.__table__.columns if not coluna.nullable}
+
+def validar(itens, schema, chave: str = None, model=None):
+    # Retorna [(indice, id, dados)] dos itens válidos e a lista de erros. Com o
+    # model, um null em coluna NOT NULL (permitido pelos schemas *Update) vira
+    # erro do item em vez de derrubar o lote inteiro no commit
+    obrigatorias = colunas_obrigatorias(model) if model is not None else set()
+    validos, erros = [], []
+    for indice, item in enumerate(itens):
+        if not isinstance(item, dict):
+            erros.append(erro(indice, "Item deve ser um objeto"))
+            continue
+        id = None
+        if chave is not None:
+            id = item.get(chave)
+            if not isinstance(id, int) or isinstance(id, bool):
+                erros.append(erro(indice, f"Campo {chave} obrigatório e inteiro"))
+                continue
+        try:
+            dados = schema.model_validate({k: v for k, v in item.items() if k != chave})
+        except ValidationError as e:
+            erros.append(erro(indice, jsonable_encoder(e.errors(include_url=False, include_context=False)), id))
+            continue
+        dados = dados.model_dump(exclude_unset=chave is not None)
+        nulos = [campo for campo, valor in dados.items() if valor is None and campo in obrigatorias]
+        if nulos:
+            erros.append(erro(indice, f"Campos não aceitam nulo: {', '.join(nulos)}", id))
+            continue
+        validos.append((indice, id, dados))
+    return validos, erros
+
+def validar_ids(itens):
+    validos, erros = [], []
+    for indice, id in enumerate(itens):
+        if not isinstance(id, int) or isinstance(id, bool):
+            erros.append(erro(indice, "Id deve ser inteiro"))
+            continue
+        validos.append((indice, id))
+    return validos, erros
+
+def inserir(db: Session, model, pk, linhas):
+    # INSERT em lote (executemany) devolvendo as chaves na ordem dos itens
+    if not linhas:
+        return []
+    stmt = insert(model).returning(pk, sort_by_parameter_order=True)
+    return list(db.scalars(stmt, linhas).all())
+
+def carregar_ativos(db: Session, model, pk, ids):
+    if not ids:
+        return {}
+    objetos = db.query(model).filter(pk.in_(set(ids)), model.dt_exclusao == None).all()
+    return {getattr(o, pk.key): o for o in objetos}
+
+def ids_ativos(db: Session, model, pk, ids):
+    if not ids:
+        return set()
+    return set(db.scalars(select(pk).where(pk.in_(set(ids)), model.dt_exclusao == None)).all())
+
+def pontos_tarefas(db: Session, ids):
+    # Pontos das tarefas não excluídas, em uma única consulta IN
+    if not ids:
+        return {}
+    linhas = db.execute(
+        select(Tarefa.idtarefa, Tarefa.pontos).where(Tarefa.idtarefa.in_(set(ids)), Tarefa.dt_exclusao == None)
+    ).all()
+    return dict(linhas)
+
+def marcar_excluidos(db: Session, model, pk, ids):
+    if not ids:
+        return
+    db.execute(
+        update(model)
+        .where(pk.in_(set(ids)), model.dt_exclusao == None)
+        .values(dt_exclusao=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
@@ -4,25 +4,52 @@ from fastapi.exceptions import RequestValidationError
 from starlette.status import HTTP_400_BAD_REQUEST
 from fastapi.encoders import jsonable_encoder
 import schemas
-from database import get_db, engine, Base
-from config_log import logger
-from models import Usuario, Tarefa, Historico, Recompensa
-import ETL
+from database import get_async_db, engine, async_engine, Base, SessionLocal
+from config_log import logger, nivel_atual, definir_nivel
+from models import Usuario, Tarefa, Historico, Recompensa, Job
+import fila
+import pontuacao
+import paginacao
+import streaming
+import serializacao
+import lote
+import migracoes
+import versoes
+import cache_leitura
+import cache_api
+import metricas
+from middleware import ContextoLogMiddleware, MetricasMiddleware, ConsultasSQLMiddleware, CompressaoMiddleware
+import cliente_http
 from sqlalchemy.orm import Session
-from dicttoxml import dicttoxml
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
-import requests
-from sqlalchemy import func
-from typing import List
+from sqlalchemy import select
+from typing import List, Any
+from contextlib import asynccontextmanager
 
 Base.metadata.create_all(bind=engine)
+migracoes.aplicar(engine)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with SessionLocal() as db:
+        pontuacao.reconstruir_se_vazio(db)
+    fila.iniciar()
+    yield
+    fila.parar()
+    cliente_http.fechar()
+    await async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressaoMiddleware)
+app.add_middleware(ContextoLogMiddleware)
+app.add_middleware(MetricasMiddleware)
+app.add_middleware(ConsultasSQLMiddleware)
 
 @app.exception_handler(RequestValidationError)
 def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.error(f"Erro de validação na requisição {request.url}: {exc.errors}")
+    logger.error("Erro de validação na requisição %s: %s", request.url, exc.errors)
     return JSONResponse(
         status_code=HTTP_400_BAD_REQUEST,
         content={
@@ -31,13 +58,43 @@ def validation_exception_handler(request: Request, exc: RequestValidationError):
         },
     )
 
-def format_response(data: dict, request, status_code: int = 200):
+def formato_resposta(request) -> str:
     accept = request.headers.get("accept", "application/json").lower()
-    if "application/xml" in accept:
-        xml = dicttoxml(data, custom_root='response', attr_type=False)
-        return Response(content=xml, media_type="application/xml", status_code=status_code)
+    return "xml" if "application/xml" in accept else "json"
+
+def format_response(data: dict, request, status_code: int = 200, headers: Optional[dict] = None, etag: Optional[str] = None):
+    if etag:
+        headers = {**(headers or {}), "ETag": etag, "Vary": "Accept"}
+    if formato_resposta(request) == "xml":
+        return serializacao.XMLRapida(content=data, status_code=status_code, headers=headers)
     else:
-        return JSONResponse(content=data, status_code=status_code)
+        return serializacao.JSONRapida(content=data, status_code=status_code, headers=headers)
+
+# GET condicional: o ETag vem da versão da tabela (incrementada a cada escrita),
+# então o 304 é respondido sem carregar nem serializar nenhum registro
+async def condicional(db: AsyncSession, model, request: Request, formato_stream: Optional[str] = None):
+    tabela = model.__tablename__
+    versao = await db.run_sync(versoes.versao, tabela)
+    # O ETag é do formato realmente servido: uma listagem em streaming (ex.: NDJSON
+    # pelo Accept) não pode receber 304 pelo ETag da lista JSON da mesma URL
+    formato = f"stream-{formato_stream}" if formato_stream else formato_resposta(request)
+    etag = versoes.etag(tabela, versao, formato, request.url.path, request.url.query)
+    if versoes.etag_corresponde(request.headers.get("if-none-match"), etag):
+        return etag, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Vary": "Accept"})
+    return etag, None
+
+# Resposta de uma consulta por id guardada no cache de leitura
+def resposta_em_cache(entrada, request: Request):
+    corpo, media_type, etag = entrada
+    headers = {"ETag": etag, "Vary": "Accept"}
+    if versoes.etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=corpo, media_type=media_type, headers=headers)
+
+# Busca um registro não excluído pela chave primária na sessão assíncrona
+async def buscar_ativo(db: AsyncSession, model, pk, id):
+    resultado = await db.execute(select(model).where(pk == id, model.dt_exclusao == None))
+    return resultado.scalars().first()
 
 #Inicio da API
 @app.get("/")
@@ -51,309 +108,669 @@ def root():
 #-------------------------------------------------------------- TAREFA ------------------------------------------------------
 # POST - Adiciona uma Tarefa
 @app.post("/task/", status_code=status.HTTP_201_CREATED)
-def criar_tarefa(tarefa: schemas.TaskCreate, db: Session = Depends(get_db)):
-    logger.debug(f"Dados para nova tarefa foram recebidos com sucesso: {tarefa.dict()}")
+async def criar_tarefa(tarefa: schemas.TaskCreate, db: AsyncSession = Depends(get_async_db)):
+    logger.debug("Dados para nova tarefa foram recebidos com sucesso: %s", tarefa)
     try:
         nova_tarefa = Tarefa(**tarefa.dict())
         db.add(nova_tarefa)
-        db.commit()
-        db.refresh(nova_tarefa)
-        logger.info(f"Tarefa {nova_tarefa.idtarefa} foi criada com sucesso")
+        await db.commit()
+        await db.refresh(nova_tarefa)
+        logger.info("Tarefa %s foi criada com sucesso", nova_tarefa.idtarefa)
         return nova_tarefa
     except Exception as e:
-        logger.error(f"Erro ao criar tarefa: {str(e)}")
+        logger.error("Erro ao criar tarefa: %s", e)
         raise HTTPException(status_code=400, detail=f"Erro ao criar tarefa: {str(e)}")
     
+# POST - Adiciona tarefas em lote
+@app.post("/task/bulk", status_code=status.HTTP_201_CREATED)
+async def criar_tarefas_lote(request: Request, itens: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_criar_tarefas_lote, request, itens)
+
+def _criar_tarefas_lote(db: Session, request: Request, itens: List[Any]):
+    lote.verificar_tamanho(itens)
+    logger.debug("Recebidas %s tarefas para criação em lote", len(itens))
+    validos, erros = lote.validar(itens, schemas.TaskCreate)
+    try:
+        ids = lote.inserir(db, Tarefa, Tarefa.idtarefa, [dados for _, _, dados in validos])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Erro ao criar tarefas em lote: %s", e)
+        raise HTTPException(status_code=400, detail=f"Erro ao criar tarefas em lote: {str(e)}")
+    logger.info("%s tarefas criadas em lote, %s com erro", len(ids), len(erros))
+    return format_response(lote.resultado("criados", ids, erros), request, status_code=201)
+
+# UPDATE - Altera tarefas em lote
+@app.patch("/task/bulk", status_code=status.HTTP_200_OK)
+async def atualizar_tarefas_lote(request: Request, itens: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_atualizar_tarefas_lote, request, itens)
+
+def _atualizar_tarefas_lote(db: Session, request: Request, itens: List[Any]):
+    lote.verificar_tamanho(itens)
+    logger.debug("Recebidas %s tarefas para atualização em lote", len(itens))
+    validos, erros = lote.validar(itens, schemas.TaskUpdate, chave="idtarefa", model=Tarefa)
+    tarefas = lote.carregar_ativos(db, Tarefa, Tarefa.idtarefa, [id for _, id, _ in validos])
+    atualizados = []
+    deltas = {}
+    for indice, id, update_data in validos:
+        tarefa_db = tarefas.get(id)
+        if not tarefa_db:
+            erros.append(lote.erro(indice, "Tarefa não encontrada", id))
+            continue
+        if update_data.get("pontos") is not None:
+            deltas[id] = deltas.get(id, 0) + update_data["pontos"] - tarefa_db.pontos
+        for key, value in update_data.items():
+            setattr(tarefa_db, key, value)
+        atualizados.append(id)
+    pontuacao.ajustar_por_tarefas(db, deltas)
+    try:
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Erro ao atualizar tarefas em lote: %s", e)
+        raise HTTPException(status_code=400, detail=f"Erro ao atualizar tarefas em lote: {str(e)}")
+    cache_leitura.cache.invalidar(Tarefa.__tablename__, *atualizados)
+    logger.info("%s tarefas atualizadas em lote, %s com erro", len(atualizados), len(erros))
+    return format_response(lote.resultado("atualizados", atualizados, erros), request)
+
+# DELETE - Apaga tarefas em lote
+@app.delete("/task/bulk", status_code=status.HTTP_200_OK)
+async def deletar_tarefas_lote(request: Request, ids: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_deletar_tarefas_lote, request, ids)
+
+def _deletar_tarefas_lote(db: Session, request: Request, ids: List[Any]):
+    lote.verificar_tamanho(ids)
+    validos, erros = lote.validar_ids(ids)
+    tarefas = lote.carregar_ativos(db, Tarefa, Tarefa.idtarefa, [id for _, id in validos])
+    excluidos = []
+    deltas = {}
+    for indice, id in validos:
+        tarefa = tarefas.pop(id, None)
+        if not tarefa:
+            erros.append(lote.erro(indice, "Tarefa não encontrada", id))
+            continue
+        deltas[id] = -tarefa.pontos
+        excluidos.append(id)
+    pontuacao.ajustar_por_tarefas(db, deltas)
+    lote.marcar_excluidos(db, Tarefa, Tarefa.idtarefa, excluidos)
+    db.commit()
+    cache_leitura.cache.invalidar(Tarefa.__tablename__, *excluidos)
+    logger.info("%s tarefas marcadas como deletadas em lote", len(excluidos))
+    return format_response(lote.resultado("excluidos", excluidos, erros), request)
+
 # GET - Busca uma tarefa (Opcional ser por ID)    
 @app.get("/task/", status_code=status.HTTP_200_OK)
-def buscar_tarefa(request: Request, id: Optional[int] = Query(default=None), db: Session = Depends(get_db)):
-    busca_tarefa = db.query(Tarefa).all()
+async def buscar_tarefa(request: Request, id: Optional[int] = Query(default=None), after_id: Optional[int] = Query(default=None), limit: Optional[int] = Query(default=None, ge=1), fields: Optional[str] = Query(default=None), stream: bool = Query(default=False), db: AsyncSession = Depends(get_async_db)):
+    if id is not None:
+        em_cache = cache_leitura.cache.get(Tarefa.__tablename__, id, formato_resposta(request))
+        if em_cache:
+            return resposta_em_cache(em_cache, request)
+    geracao = cache_leitura.cache.geracao()
+    formato = streaming.formato_stream(request, stream) if id is None else None
+    etag, nao_modificado = await condicional(db, Tarefa, request, formato)
+    if nao_modificado:
+        return nao_modificado
     if id is not None:
-        logger.info(f"Realizando busca da tarefa {id}")
-        busca_tarefa = db.query(Tarefa).filter(Tarefa.idtarefa == id, Tarefa.dt_exclusao == None).first()
+        logger.info("Realizando busca da tarefa %s", id)
+        busca_tarefa = await db.run_sync(serializacao.buscar_registro, Tarefa, schemas.TaskOut, [Tarefa.idtarefa == id, Tarefa.dt_exclusao == None])
         if not busca_tarefa:
-            logger.warning(f"Tarefa {id} não foi encontrada")
+            logger.warning("Tarefa %s não foi encontrada", id)
             return format_response({"mensage": "Essa tarefa não pode ser encontrada"}, request, status_code=404)
-        logger.info(f"Tarefa {id} encontrada com sucesso")
-        task_out = schemas.TaskOut.from_orm(busca_tarefa)
-        task_dict = jsonable_encoder(task_out)
-        return format_response(task_dict, request)
+        logger.info("Tarefa %s encontrada com sucesso", id)
+        resposta = format_response(busca_tarefa, request, etag=etag)
+        cache_leitura.cache.set(Tarefa.__tablename__, id, formato_resposta(request), resposta, geracao)
+        return resposta
     else:
         logger.debug("Realizando a busca de todas as tarefas")
-        busca_tarefa = db.query(Tarefa).filter(Tarefa.dt_exclusao == None).all()
-        tarefas_out = [jsonable_encoder(schemas.TaskOut.from_orm(t)) for t in busca_tarefa]
-        logger.info(f"{len(busca_tarefa)} tarefas encontradas com sucesso")
-        return format_response(tarefas_out, request)
+        if formato:
+            return streaming.resposta_stream(formato, Tarefa, Tarefa.idtarefa, schemas.TaskOut, [Tarefa.dt_exclusao == None],
+                                             after_id=after_id, limit=limit, fields=fields, etag=etag)
+        busca_tarefa, proximo, limite = await db.run_sync(
+            paginacao.listar, Tarefa, Tarefa.idtarefa, schemas.TaskOut, [Tarefa.dt_exclusao == None],
+            after_id=after_id, limit=limit, fields=fields
+        )
+        logger.info("%s tarefas encontradas com sucesso", len(busca_tarefa))
+        return format_response(busca_tarefa, request, headers=paginacao.cabecalhos_cursor(request, proximo, limite), etag=etag)
 
 # DELETE - Apaga uma tarefa via ID
 @app.delete("/task/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def deletar_tarefa(id: int, db: Session = Depends(get_db)):
-    logger.debug(f"Deletando tarefa {id}")
-    tarefa = db.query(Tarefa).filter(Tarefa.idtarefa == id, Tarefa.dt_exclusao == None).first()
+async def deletar_tarefa(id: int, db: AsyncSession = Depends(get_async_db)):
+    logger.debug("Deletando tarefa %s", id)
+    tarefa = await buscar_ativo(db, Tarefa, Tarefa.idtarefa, id)
     if not tarefa:
-        logger.warning(f"Tarefa {id} não foi encontrada")
+        logger.warning("Tarefa %s não foi encontrada", id)
         raise HTTPException(status_code=404, detail="Essa tarefa não pode ser deletada")
+    await db.run_sync(pontuacao.ajustar_por_tarefa, tarefa.idtarefa, -tarefa.pontos)
     tarefa.dt_exclusao = datetime.utcnow()
-    db.commit()
-    logger.info(f"Tarefa {id} foi marcada como deletada")
+    await db.commit()
+    cache_leitura.cache.invalidar(Tarefa.__tablename__, id)
+    logger.info("Tarefa %s foi marcada como deletada", id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # UPDATE - Altera campos da tabela tarefa
 @app.patch("/task/{id}", status_code=status.HTTP_200_OK)
-def atualizar_tarefa(id: int, tarefa_update: schemas.TaskUpdate = Body(...), db: Session = Depends(get_db),request: Request = None):
-    logger.debug(f"Atualizando tarefa {id} com novos dados: {tarefa_update.dict(exclude_unset=True)}")
-    tarefa_db = db.query(Tarefa).filter(Tarefa.idtarefa == id, Tarefa.dt_exclusao == None).first()
+async def atualizar_tarefa(id: int, tarefa_update: schemas.TaskUpdate = Body(...), db: AsyncSession = Depends(get_async_db),request: Request = None):
+    update_data = tarefa_update.dict(exclude_unset=True)
+    logger.debug("Atualizando tarefa %s com novos dados: %s", id, update_data)
+    tarefa_db = await buscar_ativo(db, Tarefa, Tarefa.idtarefa, id)
     if not tarefa_db:
-        logger.warning(f"tarefa {id} não foi encontrada")
+        logger.warning("tarefa %s não foi encontrada", id)
         return format_response({"mensage": "Tarefa não pode ser editada"}, request, status_code=404)
     
-    update_data = tarefa_update.dict(exclude_unset=True)
+
+    if update_data.get("pontos") is not None:
+        await db.run_sync(pontuacao.ajustar_por_tarefa, tarefa_db.idtarefa, update_data["pontos"] - tarefa_db.pontos)
 
     for key, value in update_data.items():
         setattr(tarefa_db, key, value)
 
-    db.commit()
-    db.refresh(tarefa_db)
-    task_out = schemas.TaskOut.from_orm(tarefa_db)
-    task_dict = jsonable_encoder(task_out)
-    logger.info(f"Tarefa {id} atualizada com sucesso")
+    await db.commit()
+    cache_leitura.cache.invalidar(Tarefa.__tablename__, id)
+    await db.refresh(tarefa_db)
+    task_dict = serializacao.registro_orm(tarefa_db, serializacao.campos_out(schemas.TaskOut))
+    logger.info("Tarefa %s atualizada com sucesso", id)
     return format_response(task_dict, request)
 
 #-------------------------------------------------------------- USUÁRIO ------------------------------------------------------                                             
 
 # POST - Adiciona um usuário
 @app.post("/user/", status_code=status.HTTP_201_CREATED)
-def criar_usuario(usuario: schemas.UserCreate, db: Session = Depends(get_db)):
-    logger.debug(f"Dados para novo usário foram recebidos com sucesso: {usuario.dict()}")
+async def criar_usuario(usuario: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    logger.debug("Dados para novo usário foram recebidos com sucesso: %s", usuario)
     try:
         novo_usuario = Usuario(**usuario.dict())
         db.add(novo_usuario)
-        db.commit()
-        db.refresh(novo_usuario)
-        logger.info(f"Usuário {novo_usuario.idusuario} foi criado com sucesso")
+        await db.commit()
+        await db.refresh(novo_usuario)
+        logger.info("Usuário %s foi criado com sucesso", novo_usuario.idusuario)
         return novo_usuario
         
     except Exception as e:
-        logger.error(f"Erro ao criar usuário: {str(e)}")
+        logger.error("Erro ao criar usuário: %s", e)
         raise HTTPException(status_code=400, detail=f"Erro ao cadastrar usuário: {str(e)}")
     
+# POST - Adiciona usuários em lote
+@app.post("/user/bulk", status_code=status.HTTP_201_CREATED)
+async def criar_usuarios_lote(request: Request, itens: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_criar_usuarios_lote, request, itens)
+
+def _criar_usuarios_lote(db: Session, request: Request, itens: List[Any]):
+    lote.verificar_tamanho(itens)
+    logger.debug("Recebidos %s usuários para criação em lote", len(itens))
+    validos, erros = lote.validar(itens, schemas.UserCreate)
+    try:
+        ids = lote.inserir(db, Usuario, Usuario.idusuario, [dados for _, _, dados in validos])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Erro ao criar usuários em lote: %s", e)
+        raise HTTPException(status_code=400, detail=f"Erro ao cadastrar usuários em lote: {str(e)}")
+    logger.info("%s usuários criados em lote, %s com erro", len(ids), len(erros))
+    return format_response(lote.resultado("criados", ids, erros), request, status_code=201)
+
+# UPDATE - Altera usuários em lote
+@app.patch("/user/bulk", status_code=status.HTTP_200_OK)
+async def atualizar_usuarios_lote(request: Request, itens: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_atualizar_usuarios_lote, request, itens)
+
+def _atualizar_usuarios_lote(db: Session, request: Request, itens: List[Any]):
+    lote.verificar_tamanho(itens)
+    logger.debug("Recebidos %s usuários para atualização em lote", len(itens))
+    validos, erros = lote.validar(itens, schemas.UserUpdate, chave="idusuario", model=Usuario)
+    usuarios = lote.carregar_ativos(db, Usuario, Usuario.idusuario, [id for _, id, _ in validos])
+    atualizados = []
+    for indice, id, update_user in validos:
+        usuario_db = usuarios.get(id)
+        if not usuario_db:
+            erros.append(lote.erro(indice, "Usuário não encontrado", id))
+            continue
+        for key, value in update_user.items():
+            setattr(usuario_db, key, value)
+        atualizados.append(id)
+    try:
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Erro ao atualizar usuários em lote: %s", e)
+        raise HTTPException(status_code=400, detail=f"Erro ao atualizar usuários em lote: {str(e)}")
+    cache_leitura.cache.invalidar(Usuario.__tablename__, *atualizados)
+    logger.info("%s usuários atualizados em lote, %s com erro", len(atualizados), len(erros))
+    return format_response(lote.resultado("atualizados", atualizados, erros), request)
+
+# DELETE - Apaga usuários em lote
+@app.delete("/user/bulk", status_code=status.HTTP_200_OK)
+async def deletar_usuarios_lote(request: Request, ids: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_deletar_usuarios_lote, request, ids)
+
+def _deletar_usuarios_lote(db: Session, request: Request, ids: List[Any]):
+    lote.verificar_tamanho(ids)
+    validos, erros = lote.validar_ids(ids)
+    ativos = lote.ids_ativos(db, Usuario, Usuario.idusuario, [id for _, id in validos])
+    excluidos = []
+    for indice, id in validos:
+        if id not in ativos:
+            erros.append(lote.erro(indice, "Usuário não encontrado", id))
+            continue
+        ativos.discard(id)
+        excluidos.append(id)
+    lote.marcar_excluidos(db, Usuario, Usuario.idusuario, excluidos)
+    db.commit()
+    cache_leitura.cache.invalidar(Usuario.__tablename__, *excluidos)
+    logger.info("%s usuários marcados como deletados em lote", len(excluidos))
+    return format_response(lote.resultado("excluidos", excluidos, erros), request)
+
 # GET - Busca um usuário (Opcional ser por ID)    
 @app.get("/user/", status_code=status.HTTP_200_OK)
-def buscar_usuario(request: Request, id: Optional[int] = Query(default=None), db: Session = Depends(get_db)):
+async def buscar_usuario(request: Request, id: Optional[int] = Query(default=None), after_id: Optional[int] = Query(default=None), limit: Optional[int] = Query(default=None, ge=1), fields: Optional[str] = Query(default=None), stream: bool = Query(default=False), db: AsyncSession = Depends(get_async_db)):
+    if id is not None:
+        em_cache = cache_leitura.cache.get(Usuario.__tablename__, id, formato_resposta(request))
+        if em_cache:
+            return resposta_em_cache(em_cache, request)
+    geracao = cache_leitura.cache.geracao()
+    formato = streaming.formato_stream(request, stream) if id is None else None
+    etag, nao_modificado = await condicional(db, Usuario, request, formato)
+    if nao_modificado:
+        return nao_modificado
     if id is not None:
-        logger.info(f"Realizando busca do usuário {id}")
-        Busca_usuario = db.query(Usuario).filter(Usuario.idusuario == id, Usuario.dt_exclusao == None).first()
+        logger.info("Realizando busca do usuário %s", id)
+        Busca_usuario = await db.run_sync(serializacao.buscar_registro, Usuario, schemas.UserOut, [Usuario.idusuario == id, Usuario.dt_exclusao == None])
         if not Busca_usuario:
-            logger.warning(f"Usuário {id} não foi encontrado")
+            logger.warning("Usuário %s não foi encontrado", id)
             return format_response({"mensage": "Esse usuário não pode ser encontrado"}, request, status_code=404)
-        logger.info(f"Usuário {id} encontrado com sucesso")
-        user_out = schemas.UserOut.from_orm(Busca_usuario)
-        user_dict = jsonable_encoder(user_out)
-        return format_response(user_dict, request)
+        logger.info("Usuário %s encontrado com sucesso", id)
+        resposta = format_response(Busca_usuario, request, etag=etag)
+        cache_leitura.cache.set(Usuario.__tablename__, id, formato_resposta(request), resposta, geracao)
+        return resposta
     else:
         logger.debug("Realizando a busca de todos os usuários")
-        busca_usuario = db.query(Usuario).filter(Usuario.dt_exclusao == None).all()
-        user_out = [jsonable_encoder(schemas.UserOut.from_orm(u)) for u in busca_usuario]
-        logger.info(f"{len(busca_usuario)} usuários encontrados com sucesso")
-        return format_response(user_out, request)
+        if formato:
+            return streaming.resposta_stream(formato, Usuario, Usuario.idusuario, schemas.UserOut, [Usuario.dt_exclusao == None],
+                                             after_id=after_id, limit=limit, fields=fields, etag=etag)
+        busca_usuario, proximo, limite = await db.run_sync(
+            paginacao.listar, Usuario, Usuario.idusuario, schemas.UserOut, [Usuario.dt_exclusao == None],
+            after_id=after_id, limit=limit, fields=fields
+        )
+        logger.info("%s usuários encontrados com sucesso", len(busca_usuario))
+        return format_response(busca_usuario, request, headers=paginacao.cabecalhos_cursor(request, proximo, limite), etag=etag)
 
 # DELETE - Apaga o cadastro de um usuário via ID
 @app.delete("/user/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def deletar_usuario(id: int, db: Session = Depends(get_db)):
-    logger.debug(f"Deletando usuário {id}")
-    usuario = db.query(Usuario).filter(Usuario.idusuario == id, Usuario.dt_exclusao == None).first()
+async def deletar_usuario(id: int, db: AsyncSession = Depends(get_async_db)):
+    logger.debug("Deletando usuário %s", id)
+    usuario = await buscar_ativo(db, Usuario, Usuario.idusuario, id)
     if not usuario:
-        logger.warning(f"Usuário {id} não foi encontrado")
+        logger.warning("Usuário %s não foi encontrado", id)
         raise HTTPException(status_code=404, detail="Esse usuário não pode ser deletado")
     usuario.dt_exclusao = datetime.utcnow()
-    db.commit()
-    logger.info(f"usuário {id} foi marcado como deletado")
+    await db.commit()
+    cache_leitura.cache.invalidar(Usuario.__tablename__, id)
+    logger.info("usuário %s foi marcado como deletado", id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # UPDATE - Altera campos da tabela usuário
 @app.patch("/user/{id}", status_code=status.HTTP_200_OK)
-def atualizar_usuario(id: int, usuario_update: schemas.UserUpdate = Body(...), db: Session = Depends(get_db),request: Request = None):
-    logger.debug(f"Atualizando usuário {id} com novos dados: {usuario_update.dict(exclude_unset=True)}")
-    usuario_db = db.query(Usuario).filter(Usuario.idusuario == id, Usuario.dt_exclusao == None).first()
+async def atualizar_usuario(id: int, usuario_update: schemas.UserUpdate = Body(...), db: AsyncSession = Depends(get_async_db),request: Request = None):
+    update_user = usuario_update.dict(exclude_unset=True)
+    logger.debug("Atualizando usuário %s com novos dados: %s", id, update_user)
+    usuario_db = await buscar_ativo(db, Usuario, Usuario.idusuario, id)
     if not usuario_db:
-        logger.warning(f"usuário {id} não foi encontrado")
+        logger.warning("usuário %s não foi encontrado", id)
         return format_response({"mensage": "Usuário não pode ser editado"}, request, status_code=404)
     
-    update_user = usuario_update.dict(exclude_unset=True)
 
     for key, value in update_user.items():
         setattr(usuario_db, key, value)
 
-    db.commit()
-    db.refresh(usuario_db)
+    await db.commit()
+    cache_leitura.cache.invalidar(Usuario.__tablename__, id)
+    await db.refresh(usuario_db)
 
-    user_out = schemas.UserOut.from_orm(usuario_db)
-    user_dict = jsonable_encoder(user_out)
-    logger.info(f"Usuário {id} atualizado com sucesso")
+    user_dict = serializacao.registro_orm(usuario_db, serializacao.campos_out(schemas.UserOut))
+    logger.info("Usuário %s atualizado com sucesso", id)
     return format_response(user_dict, request)    
 
 #-------------------------------------------------------------- HISTÓRICO ------------------------------------------------------
 
+# Ajusta a pontuação e enfileira a recompensa quando a finalização de um histórico muda
+# (o saldo é alterado em "saldos" e gravado pelo chamador com saldos.gravar)
+# Devolve o job de recompensa enfileirado (ou None)
+def mudar_finalizacao(db: Session, historico_db: Historico, finalizada, pontos_tarefa, saldos: pontuacao.Saldos) -> Optional[Job]:
+    if bool(finalizada) == bool(historico_db.finalizada):
+        return None
+    if pontos_tarefa is not None:
+        delta = pontos_tarefa if historico_db.finalizada else -pontos_tarefa
+        saldos.ajustar(historico_db.idusuario, delta)
+    if historico_db.finalizada:
+        pontos = saldos.pontos[historico_db.idusuario]
+        return fila.enfileirar_recom(db, idhist=historico_db.idhist, pontos=pontos)
+    return None
+
+# Cabeçalhos que apontam para o job de recompensa, consultado em /job/{id}
+def cabecalhos_job(idjob: int) -> dict:
+    return {"X-Job-Id": str(idjob), "Location": f"/job/{idjob}"}
+
 # POST - Adiciona um histórico
 @app.post("/hist/", status_code=status.HTTP_201_CREATED)
-def criar_historico(historico: schemas.HistCreate, db: Session = Depends(get_db)):
-    logger.debug(f"Dados para novo histórico foram recebidos com sucesso: {historico.dict()}")
+async def criar_historico(historico: schemas.HistCreate, response: Response, db: AsyncSession = Depends(get_async_db)):
+    logger.debug("Dados para novo histórico foram recebidos com sucesso: %s", historico)
     
-    usuario = db.query(Usuario).filter(
-        Usuario.idusuario == historico.idusuario,
-        Usuario.dt_exclusao == None
-    ).first()
+    usuario = await buscar_ativo(db, Usuario, Usuario.idusuario, historico.idusuario)
     if not usuario:
-        logger.warning(f"Esse usuário não existe: {historico.idusuario}")
+        logger.warning("Esse usuário não existe: %s", historico.idusuario)
         raise HTTPException(status_code=400, detail="Usuário não encontrado ou excluído")
 
-    tarefa = db.query(Tarefa).filter(
-        Tarefa.idtarefa == historico.idtarefa,
-        Tarefa.dt_exclusao == None
-    ).first()
+    tarefa = await buscar_ativo(db, Tarefa, Tarefa.idtarefa, historico.idtarefa)
     if not tarefa:
-        logger.warning(f"Essa tarefa não existe: {historico.idtarefa}")
+        logger.warning("Essa tarefa não existe: %s", historico.idtarefa)
         raise HTTPException(status_code=400, detail="Tarefa não encontrada ou excluída")
 
     try:
         novo_historico = Historico(**historico.dict())
         db.add(novo_historico)
-        db.commit()
-        db.refresh(novo_historico)
-        logger.info(f"Histórico {novo_historico.idhist} foi criado com sucesso")
-    
-        if novo_historico.finalizada == 1:
-            pontos = (
-            db.query(
-                func.sum(Tarefa.pontos).label("total_pontos")
-            )
-                .select_from(Historico)
-                .join(Tarefa, Historico.idtarefa == Tarefa.idtarefa) 
-                .filter(Historico.finalizada == True, 
-                        Historico.dt_exclusao == None, 
-                        Tarefa.dt_exclusao == None,
-                        Historico.idusuario == novo_historico.idusuario
-                        )
-                .group_by(Historico.idusuario)
-                .scalar()
-            )
-        
-        criar_recom(pontos=pontos, db=db, idhist=novo_historico.idhist)
+        await db.flush()
+
+        if novo_historico.finalizada:
+            await db.run_sync(pontuacao.ajustar, novo_historico.idusuario, tarefa.pontos)
+            pontos = await db.run_sync(pontuacao.pontos_usuario, novo_historico.idusuario)
+            job = fila.enfileirar_recom(db, idhist=novo_historico.idhist, pontos=pontos)
+            await db.flush()
+            response.headers.update(cabecalhos_job(job.idjob))
+
+        await db.commit()
+        await db.refresh(novo_historico)
+        logger.info("Histórico %s foi criado com sucesso", novo_historico.idhist)
+
+        if novo_historico.finalizada:
+            fila.notificar()
 
         return Historico(**historico.dict())
     
     except Exception as e:
-        logger.error(f"Erro ao criar histórico: {str(e)}")
+        await db.rollback()
+        logger.error("Erro ao criar histórico: %s", e)
         raise HTTPException(status_code=400, detail=f"Erro ao cadastrar histórico: {str(e)}")
     
+# POST - Adiciona históricos em lote
+@app.post("/hist/bulk", status_code=status.HTTP_201_CREATED)
+async def criar_historicos_lote(request: Request, itens: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_criar_historicos_lote, request, itens)
+
+def _criar_historicos_lote(db: Session, request: Request, itens: List[Any]):
+    lote.verificar_tamanho(itens)
+    logger.debug("Recebidos %s históricos para criação em lote", len(itens))
+    validos, erros = lote.validar(itens, schemas.HistCreate)
+
+    # Chaves estrangeiras validadas com uma consulta IN por tabela
+    usuarios = lote.ids_ativos(db, Usuario, Usuario.idusuario, [dados["idusuario"] for _, _, dados in validos])
+    pontos_tarefa = lote.pontos_tarefas(db, [dados["idtarefa"] for _, _, dados in validos])
+    linhas = []
+    for indice, _, dados in validos:
+        if dados["idusuario"] not in usuarios:
+            erros.append(lote.erro(indice, "Usuário não encontrado ou excluído"))
+        elif dados["idtarefa"] not in pontos_tarefa:
+            erros.append(lote.erro(indice, "Tarefa não encontrada ou excluída"))
+        else:
+            linhas.append(dados)
+
+    try:
+        ids = lote.inserir(db, Historico, Historico.idhist, linhas)
+        saldos = pontuacao.Saldos(db, [dados["idusuario"] for dados in linhas if dados["finalizada"]])
+        for idhist, dados in zip(ids, linhas):
+            if not dados["finalizada"]:
+                continue
+            pontos = saldos.ajustar(dados["idusuario"], pontos_tarefa[dados["idtarefa"]])
+            fila.enfileirar_recom(db, idhist=idhist, pontos=pontos)
+        enfileirou = bool(saldos.deltas)
+        saldos.gravar(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Erro ao criar históricos em lote: %s", e)
+        raise HTTPException(status_code=400, detail=f"Erro ao cadastrar históricos em lote: {str(e)}")
+
+    if enfileirou:
+        fila.notificar()
+    logger.info("%s históricos criados em lote, %s com erro", len(ids), len(erros))
+    return format_response(lote.resultado("criados", ids, erros), request, status_code=201)
+
+# UPDATE - Altera históricos em lote
+@app.patch("/hist/bulk", status_code=status.HTTP_200_OK)
+async def atualizar_historicos_lote(request: Request, itens: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_atualizar_historicos_lote, request, itens)
+
+def _atualizar_historicos_lote(db: Session, request: Request, itens: List[Any]):
+    lote.verificar_tamanho(itens)
+    logger.debug("Recebidos %s históricos para atualização em lote", len(itens))
+    validos, erros = lote.validar(itens, schemas.HistUpdate, chave="idhist", model=Historico)
+    historicos = lote.carregar_ativos(db, Historico, Historico.idhist, [id for _, id, _ in validos])
+    pontos_tarefa = lote.pontos_tarefas(db, [h.idtarefa for h in historicos.values()])
+    saldos = pontuacao.Saldos(db, [h.idusuario for h in historicos.values()])
+    atualizados = []
+    enfileirou = False
+    try:
+        for indice, id, update_hist in validos:
+            historico_db = historicos.get(id)
+            if not historico_db:
+                erros.append(lote.erro(indice, "Histórico não encontrado", id))
+                continue
+            finalizada = historico_db.finalizada
+            for key, value in update_hist.items():
+                setattr(historico_db, key, value)
+            if mudar_finalizacao(db, historico_db, finalizada, pontos_tarefa.get(historico_db.idtarefa), saldos):
+                enfileirou = True
+            atualizados.append(id)
+        saldos.gravar(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Erro ao atualizar históricos em lote: %s", e)
+        raise HTTPException(status_code=400, detail=f"Erro ao atualizar históricos em lote: {str(e)}")
+    cache_leitura.cache.invalidar(Historico.__tablename__, *atualizados)
+
+    if enfileirou:
+        fila.notificar()
+    logger.info("%s históricos atualizados em lote, %s com erro", len(atualizados), len(erros))
+    return format_response(lote.resultado("atualizados", atualizados, erros), request)
+
+# DELETE - Apaga históricos em lote
+@app.delete("/hist/bulk", status_code=status.HTTP_200_OK)
+async def deletar_historicos_lote(request: Request, ids: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_deletar_historicos_lote, request, ids)
+
+def _deletar_historicos_lote(db: Session, request: Request, ids: List[Any]):
+    lote.verificar_tamanho(ids)
+    validos, erros = lote.validar_ids(ids)
+    historicos = lote.carregar_ativos(db, Historico, Historico.idhist, [id for _, id in validos])
+    pontos_tarefa = lote.pontos_tarefas(db, [h.idtarefa for h in historicos.values() if h.finalizada])
+    excluidos = []
+    deltas = {}
+    for indice, id in validos:
+        historico = historicos.pop(id, None)
+        if not historico:
+            erros.append(lote.erro(indice, "Histórico não encontrado", id))
+            continue
+        if historico.finalizada and historico.idtarefa in pontos_tarefa:
+            deltas[historico.idusuario] = deltas.get(historico.idusuario, 0) - pontos_tarefa[historico.idtarefa]
+        excluidos.append(id)
+    pontuacao.ajustar_lote(db, deltas)
+    lote.marcar_excluidos(db, Historico, Historico.idhist, excluidos)
+    db.commit()
+    cache_leitura.cache.invalidar(Historico.__tablename__, *excluidos)
+    logger.info("%s históricos marcados como deletados em lote", len(excluidos))
+    return format_response(lote.resultado("excluidos", excluidos, erros), request)
+
 # GET - Busca um histórico (Opcional ser por ID)    
 @app.get("/hist/", status_code=status.HTTP_200_OK)
-def buscar_historico(request: Request, id: Optional[int] = Query(default=None), db: Session = Depends(get_db)):
+async def buscar_historico(request: Request, id: Optional[int] = Query(default=None), after_id: Optional[int] = Query(default=None), limit: Optional[int] = Query(default=None, ge=1), fields: Optional[str] = Query(default=None), stream: bool = Query(default=False), db: AsyncSession = Depends(get_async_db)):
     if id is not None:
-        logger.info(f"Realizando busca do histórico {id}")
-        busca_historico = db.query(Historico).filter(Historico.idhist == id, Historico.dt_exclusao == None).first()
+        em_cache = cache_leitura.cache.get(Historico.__tablename__, id, formato_resposta(request))
+        if em_cache:
+            return resposta_em_cache(em_cache, request)
+    geracao = cache_leitura.cache.geracao()
+    formato = streaming.formato_stream(request, stream) if id is None else None
+    etag, nao_modificado = await condicional(db, Historico, request, formato)
+    if nao_modificado:
+        return nao_modificado
+    if id is not None:
+        logger.info("Realizando busca do histórico %s", id)
+        busca_historico = await db.run_sync(serializacao.buscar_registro, Historico, schemas.HistOut, [Historico.idhist == id, Historico.dt_exclusao == None])
         if not busca_historico:
-            logger.warning(f"Histórico {id} não foi encontrado")
+            logger.warning("Histórico %s não foi encontrado", id)
             return format_response({"mensage": "Esse histórico não pode ser encontrado"}, request, status_code=404)
-        logger.info(f"Histórico {id} encontrado com sucesso")
-        hist_out = schemas.HistOut.from_orm(busca_historico)
-        hist_dict = jsonable_encoder(hist_out)
-        return format_response(hist_dict, request)
+        logger.info("Histórico %s encontrado com sucesso", id)
+        resposta = format_response(busca_historico, request, etag=etag)
+        cache_leitura.cache.set(Historico.__tablename__, id, formato_resposta(request), resposta, geracao)
+        return resposta
     else:
         logger.debug("Realizando a busca de todos os históricos")
-        busca_historico = db.query(Historico).filter(Historico.dt_exclusao == None).all()
-        hist_out = [jsonable_encoder(schemas.HistOut.from_orm(h)) for h in busca_historico]
-        logger.info(f"{len(busca_historico)} históricos encontrados com sucesso")
-        return format_response(hist_out, request)
+        if formato:
+            return streaming.resposta_stream(formato, Historico, Historico.idhist, schemas.HistOut, [Historico.dt_exclusao == None],
+                                             after_id=after_id, limit=limit, fields=fields, etag=etag)
+        busca_historico, proximo, limite = await db.run_sync(
+            paginacao.listar, Historico, Historico.idhist, schemas.HistOut, [Historico.dt_exclusao == None],
+            after_id=after_id, limit=limit, fields=fields
+        )
+        logger.info("%s históricos encontrados com sucesso", len(busca_historico))
+        return format_response(busca_historico, request, headers=paginacao.cabecalhos_cursor(request, proximo, limite), etag=etag)
 
 # DELETE - Apaga o cadastro de um histórico via ID
 @app.delete("/hist/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def deletar_historico(id: int, db: Session = Depends(get_db)):
-    logger.debug(f"Deletando histórico {id}")
-    historico = db.query(Historico).filter(Historico.idhist == id, Historico.dt_exclusao == None).first()
+async def deletar_historico(id: int, db: AsyncSession = Depends(get_async_db)):
+    logger.debug("Deletando histórico %s", id)
+    historico = await buscar_ativo(db, Historico, Historico.idhist, id)
     if not historico:
-        logger.warning(f"Histórico {id} não foi encontrado")
+        logger.warning("Histórico %s não foi encontrado", id)
         raise HTTPException(status_code=404, detail="Esse histórico não pode ser deletado")
+    if historico.finalizada:
+        tarefa = await buscar_ativo(db, Tarefa, Tarefa.idtarefa, historico.idtarefa)
+        if tarefa:
+            await db.run_sync(pontuacao.ajustar, historico.idusuario, -tarefa.pontos)
     historico.dt_exclusao = datetime.utcnow()
-    db.commit()
-    logger.info(f"Histórico {id} foi marcado como deletado")
+    await db.commit()
+    cache_leitura.cache.invalidar(Historico.__tablename__, id)
+    logger.info("Histórico %s foi marcado como deletado", id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # UPDATE - Altera campos da tabela histórico
 @app.patch("/hist/{id}", status_code=status.HTTP_200_OK)
-def atualizar_historico(id: int, historico_update: schemas.HistUpdate = Body(...), db: Session = Depends(get_db),request: Request = None):
-    logger.debug(f"Atualizando histórico {id} com novos dados: {historico_update.dict(exclude_unset=True)}")
-    historico_db = db.query(Historico).filter(Historico.idhist == id, Historico.dt_exclusao == None).first()
+async def atualizar_historico(id: int, historico_update: schemas.HistUpdate = Body(...), db: AsyncSession = Depends(get_async_db),request: Request = None):
+    update_hist = historico_update.dict(exclude_unset=True)
+    logger.debug("Atualizando histórico %s com novos dados: %s", id, update_hist)
+    historico_db = await buscar_ativo(db, Historico, Historico.idhist, id)
     if not historico_db:
-        logger.warning(f"Histórico {id} não foi encontrado")
+        logger.warning("Histórico %s não foi encontrado", id)
         return format_response({"mensage": "Histórico não pode ser editado"}, request, status_code=404)
     
     finalizada = historico_db.finalizada
-    update_hist = historico_update.dict(exclude_unset=True)
 
     for key, value in update_hist.items():
         setattr(historico_db, key, value)
 
-    db.commit()
-    db.refresh(historico_db)
+    headers = None
+    if bool(finalizada) != bool(historico_db.finalizada):
+        pontos_tarefa = (await db.run_sync(lote.pontos_tarefas, [historico_db.idtarefa])).get(historico_db.idtarefa)
+        saldos = await db.run_sync(pontuacao.Saldos, [historico_db.idusuario])
+        job = await db.run_sync(mudar_finalizacao, historico_db, finalizada, pontos_tarefa, saldos)
+        await db.run_sync(saldos.gravar)
+        if job is not None:
+            await db.flush()
+            headers = cabecalhos_job(job.idjob)
 
-    if not finalizada and historico_db.finalizada:
-        pontos = (
-        db.query(
-            func.sum(Tarefa.pontos).label("total_pontos")
-        )
-            .join(Tarefa, Historico.idtarefa == Tarefa.idtarefa) 
-            .filter(Historico.finalizada == True, 
-                    Historico.dt_exclusao == None, 
-                    Tarefa.dt_exclusao == None,
-                    Historico.idusuario == historico_db.idusuario
-                    )
-            .group_by(Historico.idusuario)
-            .scalar()
-        )
-        
-        criar_recom(pontos=pontos, db=db, idhist=historico_db.idhist)
+    await db.commit()
+    cache_leitura.cache.invalidar(Historico.__tablename__, id)
+    await db.refresh(historico_db)
 
-    hist_out = schemas.HistOut.from_orm(historico_db)
-    hist_dict = jsonable_encoder(hist_out)
-    logger.info(f"Histórico {id} atualizado com sucesso")
-    return format_response(hist_dict, request)    
+    if headers:
+        fila.notificar()
 
-#-------------------------------------------------------------- API ------------------------------------------------------
+    hist_dict = serializacao.registro_orm(historico_db, serializacao.campos_out(schemas.HistOut))
+    logger.info("Histórico %s atualizado com sucesso", id)
+    return format_response(hist_dict, request, headers=headers)    
 
-# cria uma recompensa 
-def criar_recom(pontos, db: Session, idhist: int):
-    logger.info(f"Realizando etapa de extração na recompensa de idhist {id}")
-    info, especie = ETL.Extract_API(pontos)
-    logger.info(f"Realizando etapa de transformação ne recompensa de idhist {id}")
-    nome, foto, descricao = ETL.Transform_API(info, especie)
-    new_result = Recompensa(
-            idhist=idhist,
-            nome=nome,
-            descricao=descricao,
-            imagem_url=foto,
-            pontos=pontos
-        )
-    logger.info(f"Realizando etapa de carregamento na recompensa de idhist {id}")
-    ETL.Load_API(new_result, db)
+#-------------------------------------------------------------- API ------------------------------------------------------
 
 # GET - Busca recompensa
 @app.get("/recom/", status_code=status.HTTP_200_OK)
-def buscar_recom(request: Request, id: Optional[int] = None, db: Session = Depends(get_db)):
+async def buscar_recom(request: Request, id: Optional[int] = None, after_id: Optional[int] = Query(default=None), limit: Optional[int] = Query(default=None, ge=1), fields: Optional[str] = Query(default=None), stream: bool = Query(default=False), db: AsyncSession = Depends(get_async_db)):
     if id is not None:
-        logger.info(f"Realizando busca na recompensa cujo id de histórico é {id}")
-        busca_recom = db.query(Recompensa).filter(Recompensa.idhist == id).first()
+        em_cache = cache_leitura.cache.get(Recompensa.__tablename__, id, formato_resposta(request))
+        if em_cache:
+            return resposta_em_cache(em_cache, request)
+    geracao = cache_leitura.cache.geracao()
+    formato = streaming.formato_stream(request, stream) if id is None else None
+    etag, nao_modificado = await condicional(db, Recompensa, request, formato)
+    if nao_modificado:
+        return nao_modificado
+    if id is not None:
+        logger.info("Realizando busca na recompensa cujo id de histórico é %s", id)
+        busca_recom = await db.run_sync(serializacao.buscar_registro, Recompensa, schemas.RecomOut, [Recompensa.idhist == id])
         if not busca_recom:
-            logger.warning(f"Recompensa de histórico com id: {id} não foi encontrado")
+            logger.warning("Recompensa de histórico com id: %s não foi encontrado", id)
             return format_response({"mensage": "A recompensa desse histórico não pode ser encontrado"}, request, status_code=404)
-        logger.info(f"Recompensa do histórico {id} encontrada com sucesso")
-        recom_out = schemas.RecomOut.from_orm(busca_recom)
-        recom_dict = jsonable_encoder(recom_out)
-        return format_response(recom_dict, request)
+        logger.info("Recompensa do histórico %s encontrada com sucesso", id)
+        resposta = format_response(busca_recom, request, etag=etag)
+        cache_leitura.cache.set(Recompensa.__tablename__, id, formato_resposta(request), resposta, geracao)
+        return resposta
         
     else:
         logger.debug("Realizando a busca de todas as recompensas")
-        busca_recom = db.query(Recompensa).all()
-        recom_out = [jsonable_encoder(schemas.RecomOut.from_orm(r)) for r in busca_recom]
-        logger.info(f"{len(busca_recom)} recompensas encontradas com sucesso")
-        return format_response(recom_out, request)
\ No newline at end of file
+        if formato:
+            return streaming.resposta_stream(formato, Recompensa, Recompensa.idrecom, schemas.RecomOut, [],
+                                             after_id=after_id, limit=limit, fields=fields, etag=etag)
+        busca_recom, proximo, limite = await db.run_sync(
+            paginacao.listar, Recompensa, Recompensa.idrecom, schemas.RecomOut, [],
+            after_id=after_id, limit=limit, fields=fields
+        )
+        logger.info("%s recompensas encontradas com sucesso", len(busca_recom))
+        return format_response(busca_recom, request, headers=paginacao.cabecalhos_cursor(request, proximo, limite), etag=etag)
+
+#-------------------------------------------------------------- JOB ------------------------------------------------------
+
+# GET - Lista os jobs da fila de um histórico
+@app.get("/job/", status_code=status.HTTP_200_OK)
+async def buscar_jobs_historico(request: Request, idhist: int = Query(...), db: AsyncSession = Depends(get_async_db)):
+    logger.info("Realizando busca dos jobs do histórico %s", idhist)
+    busca_jobs = (await db.execute(select(Job).where(Job.idhist == idhist).order_by(Job.idjob))).scalars().all()
+    jobs = [jsonable_encoder(schemas.JobOut.from_orm(job)) for job in busca_jobs]
+    return format_response(jobs, request)
+
+# GET - Consulta o status de um job da fila
+@app.get("/job/{id}", status_code=status.HTTP_200_OK)
+async def buscar_job(id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    logger.info("Realizando busca do job %s", id)
+    busca_job = await db.get(Job, id)
+    if not busca_job:
+        logger.warning("Job %s não foi encontrado", id)
+        return format_response({"mensage": "Esse job não pode ser encontrado"}, request, status_code=404)
+    job_out = schemas.JobOut.from_orm(busca_job)
+    job_dict = jsonable_encoder(job_out)
+    return format_response(job_dict, request)
+
+#-------------------------------------------------------------- ADMIN ------------------------------------------------------
+
+# GET - Consulta o nível de log atual
+@app.get("/admin/log", status_code=status.HTTP_200_OK)
+def buscar_nivel_log(request: Request):
+    return format_response({"nivel": nivel_atual()}, request)
+
+# GET - Estatísticas dos caches (consultas por id e PokéAPI)
+@app.get("/admin/cache", status_code=status.HTTP_200_OK)
+def buscar_estatisticas_cache(request: Request):
+    return format_response({
+        "leitura": cache_leitura.cache.estatisticas(),
+        "api": cache_api.cache.estatisticas()
+    }, request)
+
+# GET - Métricas da API no formato de texto do Prometheus
+@app.get("/metrics", include_in_schema=False)
+def buscar_metricas():
+    return Response(metricas.exportar(), media_type=metricas.CONTENT_TYPE)
+
+# UPDATE - Altera o nível de log em tempo de execução
+@app.put("/admin/log", status_code=status.HTTP_200_OK)
+def alterar_nivel_log(request: Request, log: schemas.LogNivel):
+    try:
+        definir_nivel(log.nivel)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return format_response({"nivel": nivel_atual()}, request)
\ No newline at end of file
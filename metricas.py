@@ -0,0 +1,140 @@
+import bisect
+import threading
+import time
+from functools import wraps
+
+# Métricas da API em memória, expostas em /metrics no formato de texto do
+# Prometheus. Cada atualização só incrementa números de uma série sob um lock
+# curto; a montagem do texto acontece apenas na leitura de /metrics.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+BUCKETS_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_metricas = []
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _rotulos(nomes, valores, extra="") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+def _numero(valor) -> str:
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nome: str, ajuda: str, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._series = {}
+        self._lock = threading.Lock()
+        _metricas.append(self)
+
+    def _linhas(self, valores, serie):
+        yield f"{self.nome}{_rotulos(self.rotulos, valores)} {_numero(serie)}"
+
+    def exportar(self) -> str:
+        with self._lock:
+            series = sorted((valores, self._copiar(serie)) for valores, serie in self._series.items())
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        for valores, serie in series:
+            linhas.extend(self._linhas(valores, serie))
+        return "\n".join(linhas)
+
+    def _copiar(self, serie):
+        return serie
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, *valores, quantidade=1):
+        with self._lock:
+            self._series[valores] = self._series.get(valores, 0) + quantidade
+
+class Gauge(_Metrica):
+    tipo = "gauge"
+
+    def inc(self, *valores, quantidade=1):
+        with self._lock:
+            self._series[valores] = self._series.get(valores, 0) + quantidade
+
+    def dec(self, *valores, quantidade=1):
+        self.inc(*valores, quantidade=-quantidade)
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos=(), buckets=BUCKETS_DURACAO):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(buckets)
+
+    def observar(self, valor, *valores):
+        # Série: [contagem por bucket (o último é o +Inf), soma]
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.buckets) + 1), 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def _copiar(self, serie):
+        return list(serie[0]), serie[1]
+
+    def _linhas(self, valores, serie):
+        contagens, soma = serie
+        acumulado = 0
+        for limite, contagem in zip(self.buckets + ("+Inf",), contagens):
+            acumulado += contagem
+            le = 'le="' + (limite if limite == "+Inf" else _numero(float(limite))) + '"'
+            yield f"{self.nome}_bucket{_rotulos(self.rotulos, valores, le)} {acumulado}"
+        yield f"{self.nome}_sum{_rotulos(self.rotulos, valores)} {_numero(soma)}"
+        yield f"{self.nome}_count{_rotulos(self.rotulos, valores)} {acumulado}"
+
+def exportar() -> str:
+    return "\n".join(metrica.exportar() for metrica in _metricas) + "\n"
+
+requisicoes = Contador(
+    "tarefas_http_requisicoes_total", "Requisições HTTP concluídas.", ("metodo", "rota", "status")
+)
+duracao_requisicao = Histograma(
+    "tarefas_http_duracao_segundos", "Duração das requisições HTTP em segundos.", ("metodo", "rota")
+)
+em_andamento = Gauge(
+    "tarefas_http_em_andamento", "Requisições HTTP em andamento.", ("metodo",)
+)
+tamanho_resposta = Histograma(
+    "tarefas_http_resposta_bytes", "Tamanho do corpo das respostas HTTP em bytes.", ("metodo", "rota"),
+    buckets=BUCKETS_BYTES
+)
+duracao_etl = Histograma(
+    "tarefas_etl_duracao_segundos", "Duração das etapas do pipeline de recompensa em segundos.", ("etapa",)
+)
+erros_etl = Contador(
+    "tarefas_etl_erros_total", "Exceções nas etapas do pipeline de recompensa.", ("etapa",)
+)
+
+def cronometrar(etapa: str):
+    # Decorador das etapas do ETL: registra a duração e as exceções da etapa
+    def decorador(funcao):
+        @wraps(funcao)
+        def executar(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            except Exception:
+                erros_etl.inc(etapa)
+                raise
+            finally:
+                duracao_etl.observar(time.perf_counter() - inicio, etapa)
+        return executar
+    return decorador
@@ -0,0 +1,207 @@
+import time
+from config_log import logger, contexto_requisicao
+import metricas
+import instrumentacao_sql
+import compressao
+import config
+
+# Middlewares ASGI puros (sem BaseHTTPMiddleware), para não criar tarefas
+# extras nem copiar o corpo das respostas.
+
+class ContextoLogMiddleware:
+    # Disponibiliza a requisição para os logs (rota e id da entidade) e registra a duração
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = contexto_requisicao.set(scope)
+        inicio = time.perf_counter()
+        resposta = {"status": 500}
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                resposta["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = (time.perf_counter() - inicio) * 1000
+            logger.debug("Requisição %s %s concluída com status %s em %.1f ms",
+                         scope["method"], scope["path"], resposta["status"], duracao,
+                         extra={"duracao_ms": round(duracao, 3)})
+            contexto_requisicao.reset(token)
+
+class MetricasMiddleware:
+    # Latência, status, tamanho da resposta e requisições em andamento por rota
+    # para o /metrics. A rota é o template (ex.: /task/{id}) definido pelo
+    # roteador no escopo, para não criar uma série por id.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        inicio = time.perf_counter()
+        resposta = {"status": 500, "bytes": 0}
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                resposta["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                resposta["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        metricas.em_andamento.inc(metodo)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            metricas.em_andamento.dec(metodo)
+            rota = getattr(scope.get("route"), "path", None) or "sem_rota"
+            metricas.duracao_requisicao.observar(time.perf_counter() - inicio, metodo, rota)
+            metricas.requisicoes.inc(metodo, rota, str(resposta["status"]))
+            metricas.tamanho_resposta.observar(resposta["bytes"], metodo, rota)
+
+class ConsultasSQLMiddleware:
+    # Devolve a quantidade e o tempo das consultas SQL da requisição nos
+    # cabeçalhos X-DB-Queries e X-DB-Time (ms) e registra no log os comandos
+    # repetidos (possível N+1). Os cabeçalhos refletem as consultas feitas até o
+    # início da resposta; em respostas em streaming as consultas seguintes
+    # entram apenas no log.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.DB_INSTRUMENTACAO:
+            await self.app(scope, receive, send)
+            return
+
+        token = instrumentacao_sql.iniciar()
+        consultas = instrumentacao_sql.atual()
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                repetidas = consultas.repetidas()
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-queries", str(consultas.quantidade).encode()),
+                    (b"x-db-time", f"{consultas.tempo * 1000:.2f}".encode())
+                ]
+                if repetidas:
+                    message["headers"].append((b"x-db-repeated", str(max(repetidas.values())).encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            instrumentacao_sql.finalizar(token)
+            for comando, quantidade in consultas.repetidas().items():
+                logger.warning("Possível N+1 em %s %s: comando executado %s vezes: %s",
+                               scope["method"], scope["path"], quantidade, comando)
+
+class CompressaoMiddleware:
+    # Comprime o corpo com o algoritmo negociado pelo Accept-Encoding. Respostas
+    # de corpo único abaixo de COMPRESSAO_MIN_BYTES seguem como estão; respostas
+    # em streaming são comprimidas parte a parte. Toda resposta que poderia ser
+    # comprimida (e os 304) leva Vary: Accept-Encoding e, quando há algoritmo
+    # negociado, o ETag fraco (W/), já que os bytes podem não ser os da
+    # representação original; assim o ETag do 304 é o mesmo do 200.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not compressao.DISPONIVEIS:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for nome, valor in scope["headers"]:
+            if nome == b"accept-encoding":
+                accept_encoding = valor.decode("latin-1")
+                break
+        algoritmo = compressao.escolher(accept_encoding) if accept_encoding else None
+
+        estado = {"inicio": None, "compressor": None}
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                if message["status"] == 304:
+                    message["headers"] = _cabecalhos_variante(message.get("headers", []), algoritmo)
+                    await send(message)
+                    return
+                if _compressivel(message):
+                    # Os cabeçalhos só são enviados ao ver o corpo, que decide se comprime
+                    estado["inicio"] = message
+                    return
+                await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            inicio = estado["inicio"]
+            if inicio is None:
+                if estado["compressor"] is not None:
+                    mais = message.get("more_body", False)
+                    message["body"] = estado["compressor"].parte(message.get("body", b""), final=not mais)
+                await send(message)
+                return
+
+            estado["inicio"] = None
+            corpo = message.get("body", b"")
+            mais = message.get("more_body", False)
+            cabecalhos = _cabecalhos_variante(inicio["headers"], algoritmo)
+            if algoritmo is None or (not mais and len(corpo) < config.COMPRESSAO_MIN_BYTES):
+                inicio["headers"] = cabecalhos
+                await send(inicio)
+                await send(message)
+                return
+
+            estado["compressor"] = compressao.compressor(algoritmo)
+            message["body"] = estado["compressor"].parte(corpo, final=not mais)
+            cabecalhos = [(n, v) for n, v in cabecalhos if n != b"content-length"]
+            cabecalhos.append((b"content-encoding", algoritmo.encode("latin-1")))
+            if not mais:
+                cabecalhos.append((b"content-length", str(len(message["body"])).encode("latin-1")))
+            inicio["headers"] = cabecalhos
+            await send(inicio)
+            await send(message)
+
+        await self.app(scope, receive, enviar)
+
+def _compressivel(inicio) -> bool:
+    if inicio["status"] < 200 or inicio["status"] in (204, 206, 304):
+        return False
+    tipo = b""
+    for nome, valor in inicio.get("headers", []):
+        nome = nome.lower()
+        if nome == b"content-encoding":
+            return False
+        if nome == b"cache-control" and b"no-transform" in valor.lower():
+            return False
+        if nome == b"content-type":
+            tipo = valor
+    return compressao.compressivel(tipo.decode("latin-1").lower())
+
+def _cabecalhos_variante(cabecalhos, algoritmo):
+    # Vary: Accept-Encoding e, com algoritmo negociado, o ETag na forma fraca
+    cabecalhos = [(nome.lower(), valor) for nome, valor in cabecalhos]
+    if algoritmo is not None:
+        cabecalhos = [(nome, _etag_fraco(valor) if nome == b"etag" else valor) for nome, valor in cabecalhos]
+    for i, (nome, valor) in enumerate(cabecalhos):
+        if nome == b"vary":
+            if b"accept-encoding" not in valor.lower():
+                cabecalhos[i] = (nome, valor + b", Accept-Encoding")
+            return cabecalhos
+    cabecalhos.append((b"vary", b"Accept-Encoding"))
+    return cabecalhos
+
+def _etag_fraco(valor: bytes) -> bytes:
+    return valor if valor.startswith(b"W/") else b"W/" + valor
@@ -0,0 +1,61 @@
+from sqlalchemy.schema import CreateIndex
+from database import Base, engine
+from config_log import logger
+import models
+
+# Migrações leves para bancos já existentes: o create_all só cria tabelas novas
+# e não altera as existentes. A versão aplicada fica em PRAGMA user_version e
+# cada migração é executada uma única vez, em ordem.
+
+def _criar_indices(conn, nomes):
+    for tabela in Base.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            if indice.name in nomes:
+                # IF NOT EXISTS em vez de checkfirst: a reflexão do SQLite
+                # não enxerga índices de expressão como lower(nome)
+                conn.execute(CreateIndex(indice, if_not_exists=True))
+
+def _indices_exclusao_logica(conn):
+    _criar_indices(conn, {
+        "ix_tarefa_ativa",
+        "ix_usuario_ativo",
+        "ix_historico_ativo",
+        "ix_historico_tarefa_ativa",
+        "ix_recompensa_idhist",
+        "ix_job_status_execucao"
+    })
+    conn.exec_driver_sql("ANALYZE")
+
+def _indices_dashboard(conn):
+    _criar_indices(conn, {"ix_historico_usuario_ativo", "ix_recompensa_nome"})
+    conn.exec_driver_sql("ANALYZE")
+
+def _remover_indice_usuario_finalizada(conn):
+    # Toda consulta por usuário filtra registros ativos e usa o índice parcial
+    # ix_historico_usuario_ativo; este só aumentava o custo das escritas
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_historico_usuario_finalizada")
+
+MIGRACOES = [
+    (1, "Índices parciais de registros ativos e de acesso por usuário", _indices_exclusao_logica),
+    (2, "Índices das agregações por usuário e por recompensa do dashboard", _indices_dashboard),
+    (3, "Remove o índice historico(idusuario, finalizada), coberto pelo índice parcial", _remover_indice_usuario_finalizada),
+]
+
+def versao_atual(conn) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+def aplicar(bind=engine):
+    with bind.begin() as conn:
+        versao = versao_atual(conn)
+        for numero, descricao, migracao in MIGRACOES:
+            if numero <= versao:
+                continue
+            logger.info("Aplicando migração %s: %s", numero, descricao)
+            migracao(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {numero}")
+            versao = numero
+    return versao
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    print(f"Banco de dados na versão {aplicar()}")
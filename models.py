@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, text
 from datetime import datetime, timezone
 from database import Base
 
@@ -11,6 +11,11 @@ class Recompensa(Base):
     imagem_url = Column(String, nullable=True)
     pontos = Column(Integer, nullable=False)
 
+    __table_args__ = (
+        Index("ix_recompensa_idhist", "idhist"),
+        Index("ix_recompensa_nome", text("lower(nome)")),
+    )
+
 class Historico(Base):
     __tablename__ = "historico"
     idhist = Column(Integer, primary_key=True, index=True)
@@ -22,6 +27,12 @@ class Historico(Base):
     dt_inclusao = Column(DateTime, default=datetime.now(timezone.utc))
     dt_edicao = Column(DateTime, nullable=True, default=None, onupdate=datetime.now(timezone.utc))
     dt_exclusao = Column(DateTime, nullable=True, default=None)
+
+    __table_args__ = (
+        Index("ix_historico_ativo", "idhist", sqlite_where=text("dt_exclusao IS NULL")),
+        Index("ix_historico_tarefa_ativa", "idtarefa", "finalizada", sqlite_where=text("dt_exclusao IS NULL")),
+        Index("ix_historico_usuario_ativo", "idusuario", "finalizada", "idtarefa", sqlite_where=text("dt_exclusao IS NULL")),
+    )
     
 class Usuario(Base):
     __tablename__ = "usuario"
@@ -32,6 +43,10 @@ class Usuario(Base):
     dt_inclusao = Column(DateTime, default=datetime.now(timezone.utc))
     dt_edicao = Column(DateTime, nullable=True, default=None, onupdate=datetime.now(timezone.utc))
     dt_exclusao = Column(DateTime, nullable=True, default=None)
+
+    __table_args__ = (
+        Index("ix_usuario_ativo", "idusuario", sqlite_where=text("dt_exclusao IS NULL")),
+    )
     
 class Tarefa(Base):
     __tablename__ = "tarefa"
@@ -42,4 +57,38 @@ class Tarefa(Base):
     dt_inclusao = Column(DateTime, default=datetime.now(timezone.utc))
     dt_edicao = Column(DateTime, nullable=True, default=None, onupdate=datetime.now(timezone.utc))
     dt_exclusao = Column(DateTime, nullable=True, default=None)
-    
\ No newline at end of file
+
+    __table_args__ = (
+        Index("ix_tarefa_ativa", "idtarefa", sqlite_where=text("dt_exclusao IS NULL")),
+    )
+    
+class Job(Base):
+    __tablename__ = "job"
+    idjob = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(30), nullable=False)
+    idhist = Column(Integer, ForeignKey("historico.idhist"), nullable=False)
+    pontos = Column(Integer, nullable=True)
+    status = Column(String(20), nullable=False, default="pendente")
+    tentativas = Column(Integer, nullable=False, default=0)
+    max_tentativas = Column(Integer, nullable=False)
+    proxima_execucao = Column(DateTime, nullable=False, default=datetime.utcnow)
+    bloqueado_ate = Column(DateTime, nullable=True, default=None)
+    erro = Column(String, nullable=True, default=None)
+    dt_inclusao = Column(DateTime, default=datetime.utcnow)
+    dt_edicao = Column(DateTime, nullable=True, default=None, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_job_status_execucao", "status", "proxima_execucao"),
+    )
+
+class Pontuacao(Base):
+    __tablename__ = "pontuacao"
+    idusuario = Column(Integer, ForeignKey("usuario.idusuario"), primary_key=True)
+    pontos = Column(Integer, nullable=False, default=0)
+    dt_edicao = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class VersaoTabela(Base):
+    __tablename__ = "versao_tabela"
+    tabela = Column(String(30), primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+    dt_edicao = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
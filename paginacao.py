@@ -0,0 +1,62 @@
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import serializacao
+import config
+
+# Paginação por cursor (keyset) e projeção de colunas para as rotas de listagem.
+# O cursor é a chave primária do último registro retornado: a próxima página é
+# buscada com "pk > after_id", o que usa o índice da chave em vez de OFFSET.
+# Sem "limit" a página tem PAGINACAO_PADRAO registros; a tabela inteira só é
+# lida de uma vez pela listagem em streaming.
+
+def campos_projecao(schema, fields: Optional[str]):
+    if not fields:
+        return list(schema.model_fields)
+    campos = [c.strip() for c in fields.split(",") if c.strip()]
+    invalidos = [c for c in campos if c not in schema.model_fields]
+    if invalidos:
+        raise HTTPException(status_code=400, detail=f"Campos inválidos em fields: {', '.join(invalidos)}")
+    return campos
+
+def limite_pagina(limit: Optional[int]) -> int:
+    if limit is None:
+        return min(config.PAGINACAO_PADRAO, config.PAGINACAO_MAX)
+    return min(limit, config.PAGINACAO_MAX)
+
+def montar_consulta(model, pk, campos, filtros, after_id: Optional[int] = None, limite: Optional[int] = None):
+    colunas = [getattr(model, c) for c in campos]
+    if pk.key not in campos:
+        colunas.append(pk)
+    stmt = select(*colunas).where(*filtros).order_by(pk)
+    if after_id is not None:
+        stmt = stmt.where(pk > after_id)
+    if limite is not None:
+        stmt = stmt.limit(limite)
+    return stmt
+
+def listar(db: Session, model, pk, schema, filtros, after_id: Optional[int] = None,
+           limit: Optional[int] = None, fields: Optional[str] = None):
+    campos = campos_projecao(schema, fields)
+    limite = limite_pagina(limit)
+
+    # Busca um registro a mais para saber se existe uma próxima página
+    stmt = montar_consulta(model, pk, campos, filtros, after_id, limite + 1)
+    linhas = db.execute(stmt).all()
+    proximo = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo = getattr(linhas[-1], pk.key)
+
+    itens = [serializacao.registro(linha, campos) for linha in linhas]
+    return itens, proximo, limite
+
+def cabecalhos_cursor(request, proximo, limite):
+    if proximo is None:
+        return None
+    link = request.url.include_query_params(after_id=proximo, limit=limite)
+    return {
+        "X-Next-Cursor": str(proximo),
+        "Link": f'<{link}>; rel="next"'
+    }
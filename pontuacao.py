@@ -0,0 +1,107 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from models import Pontuacao, Historico, Tarefa
+from config_log import logger
+
+# Saldo de pontos por usuário mantido incrementalmente. Equivale à soma dos
+# pontos das tarefas (não excluídas) dos históricos finalizados e não excluídos
+# do usuário, e é atualizado na mesma transação das escritas que o alteram.
+
+def ajustar_lote(db: Session, deltas: dict):
+    # Aplica {idusuario: variação} com um único upsert (executemany)
+    agora = datetime.utcnow()
+    linhas = [{"idusuario": idusuario, "pontos": delta, "dt_edicao": agora} for idusuario, delta in deltas.items() if delta]
+    if not linhas:
+        return
+    stmt = insert(Pontuacao)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Pontuacao.idusuario],
+        set_={"pontos": Pontuacao.pontos + stmt.excluded.pontos, "dt_edicao": stmt.excluded.dt_edicao}
+    )
+    db.execute(stmt, linhas)
+    logger.debug("Pontuação ajustada para %s usuários", len(linhas))
+
+def ajustar(db: Session, idusuario: int, delta: int):
+    ajustar_lote(db, {idusuario: delta})
+
+def ajustar_por_tarefas(db: Session, deltas_tarefa: dict):
+    # Aplica a variação de pontos de cada tarefa ({idtarefa: variação}) a todos os
+    # usuários que a finalizaram, com uma consulta agrupada e um único upsert
+    deltas_tarefa = {idtarefa: delta for idtarefa, delta in deltas_tarefa.items() if delta}
+    if not deltas_tarefa:
+        return
+    finalizados = db.execute(
+        select(Historico.idusuario, Historico.idtarefa, func.count(Historico.idhist))
+        .where(Historico.idtarefa.in_(deltas_tarefa),
+               Historico.finalizada == True,
+               Historico.dt_exclusao == None)
+        .group_by(Historico.idusuario, Historico.idtarefa)
+    ).all()
+    deltas = {}
+    for idusuario, idtarefa, quantidade in finalizados:
+        deltas[idusuario] = deltas.get(idusuario, 0) + deltas_tarefa[idtarefa] * quantidade
+    ajustar_lote(db, deltas)
+
+def ajustar_por_tarefa(db: Session, idtarefa: int, delta: int):
+    ajustar_por_tarefas(db, {idtarefa: delta})
+
+def pontos_usuario(db: Session, idusuario: int) -> int:
+    pontos = db.execute(select(Pontuacao.pontos).where(Pontuacao.idusuario == idusuario)).scalar()
+    return pontos or 0
+
+def pontos_usuarios(db: Session, idusuarios) -> dict:
+    idusuarios = set(idusuarios)
+    if not idusuarios:
+        return {}
+    linhas = db.execute(select(Pontuacao.idusuario, Pontuacao.pontos).where(Pontuacao.idusuario.in_(idusuarios))).all()
+    return {idusuario: 0 for idusuario in idusuarios} | dict(linhas)
+
+class Saldos:
+    # Saldos dos usuários durante uma operação em lote: lidos com uma consulta
+    # IN, alterados em memória (para o valor das recompensas enfileiradas) e
+    # gravados no final com um único upsert
+    def __init__(self, db: Session, idusuarios):
+        self.pontos = pontos_usuarios(db, idusuarios)
+        self.deltas = {}
+
+    def ajustar(self, idusuario: int, delta: int) -> int:
+        self.pontos[idusuario] += delta
+        self.deltas[idusuario] = self.deltas.get(idusuario, 0) + delta
+        return self.pontos[idusuario]
+
+    def gravar(self, db: Session):
+        ajustar_lote(db, self.deltas)
+        self.deltas = {}
+
+def reconstruir(db: Session) -> int:
+    totais = db.execute(
+        select(Historico.idusuario, func.sum(Tarefa.pontos))
+        .join(Tarefa, Historico.idtarefa == Tarefa.idtarefa)
+        .where(Historico.finalizada == True,
+               Historico.dt_exclusao == None,
+               Tarefa.dt_exclusao == None)
+        .group_by(Historico.idusuario)
+    ).all()
+    db.query(Pontuacao).delete(synchronize_session=False)
+    agora = datetime.utcnow()
+    if totais:
+        db.execute(insert(Pontuacao), [
+            {"idusuario": idusuario, "pontos": pontos, "dt_edicao": agora}
+            for idusuario, pontos in totais
+        ])
+    db.commit()
+    logger.info("Pontuação reconstruída para %s usuários", len(totais))
+    return len(totais)
+
+def reconstruir_se_vazio(db: Session):
+    if db.query(Pontuacao).first() is None:
+        reconstruir(db)
+
+if __name__ == "__main__":
+    from database import SessionLocal, engine, Base
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        total = reconstruir(db)
+    print(f"Pontuação reconstruída para {total} usuários")
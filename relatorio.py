@@ -1,16 +1,17 @@
 import streamlit as st
+import os
+from datetime import datetime, time
 import pandas as pd
 import matplotlib.pyplot as plt
 from models import Usuario, Historico, Tarefa, Recompensa
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case
 from database import get_db
-import requests
-import re
-from collections import defaultdict
+import cliente_http
+import leitura_log
+import versoes
+import sprites
+import config
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
-from PIL import Image
-import urllib.request
-import numpy as np
 from fpdf import FPDF
 
 st.set_page_config(page_title="Dash Tarefas", layout="wide")
@@ -27,10 +28,9 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-def read_log(caminho="Tarefas.log"):
-    with open(caminho, "r", encoding="latin-1") as f:
-        text = f.readlines()
-    return text
+def read_log(caminho="Tarefas.log", inicio=None, fim=None, niveis=None, ultimas=None):
+    # Iterador sobre as linhas do log (sem carregar o arquivo inteiro)
+    return leitura_log.linhas_filtradas(caminho, inicio, fim, niveis, ultimas)
 
 def pdf_log(text):
     pdf = FPDF()
@@ -48,29 +48,44 @@ def pdf_log(text):
 
     return pdf.output(dest='S').encode('latin1')
 
+@st.cache_data(max_entries=8, show_spinner=False)
+def pdf_relatorio(caminho, inode, tamanho, inicio, fim, niveis, ultimas):
+    # inode e tamanho (offset atual) do log fazem parte da chave: o mesmo
+    # relatório só é gerado de novo quando o log cresce ou é rotacionado
+    return pdf_log(read_log(caminho, inicio, fim, niveis, ultimas))
+
+def relatorio_logs(caminho="Tarefas.log"):
+    st.markdown("<br>", unsafe_allow_html=True)
+    with st.expander("Relatório de Logs"):
+        col1, col2 = st.columns(2)
+        with col1:
+            periodo = st.date_input("Período:", value=())
+            niveis = st.multiselect("Níveis:", ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
+        with col2:
+            ultimas = st.number_input("Últimas N linhas (0 = todas do período):", min_value=0, value=1000, step=100)
+
+        inicio = datetime.combine(periodo[0], time.min) if len(periodo) > 0 else None
+        fim = datetime.combine(periodo[-1], time.max) if len(periodo) > 0 else None
+
+        # O PDF só é montado quando solicitado, não a cada renderização da página
+        if st.button("Gerar Relatório de Logs"):
+            info = os.stat(caminho)
+            st.session_state["relatorio_logs"] = pdf_relatorio(
+                caminho, info.st_ino, info.st_size, inicio, fim, tuple(niveis), int(ultimas) or None
+            )
+
+        if "relatorio_logs" in st.session_state:
+            st.download_button(
+                label="Baixar Relatório de Logs",
+                data=st.session_state["relatorio_logs"],
+                file_name="relatorio_logs_api.pdf",
+                mime="application/pdf"
+            )
+
 def load_log(path="Tarefas.log"):
-    pattern = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}):\d{2}:\d{2},\d+\s-\s(\w+)")
-    counts = defaultdict(lambda: {"INFO": 0, "DEBUG": 0, "WARNING": 0, "ERROR": 0})
-
-    with open(path, "r", encoding="latin-1") as f:
-        for line in f:
-            m = pattern.match(line)
-            if m:
-                hour, level = m.groups()
-                if level in counts[hour]:
-                    counts[hour][level] += 1
-
-    df = pd.DataFrame.from_dict(counts, orient="index").sort_index()
-    df.index.name = "datetime_hour"
-    return df
-
-def img_fundo(img_url, cor=(14, 17, 23)):
-    with urllib.request.urlopen(img_url) as response:
-        img = Image.open(response).convert("RGBA")
-        fundo = Image.new("RGBA", img.size, cor + (255,))
-        img = Image.alpha_composite(fundo, img)
-        return np.array(img.convert("RGB"))
-        
+    # Lê apenas o que foi escrito desde a última atualização (ver leitura_log)
+    return leitura_log.carregar(path)
+
 def get_recom(session):
     stmt = select(
             func.lower(Recompensa.nome).label("pokemon"),
@@ -86,55 +101,58 @@ def get_task(session):
     ).where(Tarefa.dt_exclusao == None)
     return pd.read_sql(stmt, session.bind)
 
-def get_pts_user(session):
-    stmt = (
+def get_stats_user(session):
+    # Totais por usuário em uma única passada sobre historico: tarefas, finalizadas,
+    # pontos das finalizadas e recompensas recebidas
+    recompensas = (
         select(
-            Usuario.nome.label("user"),
-            func.sum(Tarefa.pontos).label("pontos")
+            Historico.idusuario,
+            func.count(Recompensa.idrecom).label("recompensas")
         )
-        .join(Historico, Historico.idusuario == Usuario.idusuario)
-        .join(Tarefa, Tarefa.idtarefa == Historico.idtarefa)
-        .where(Historico.finalizada == True, Historico.dt_exclusao == None)
-        .group_by(Usuario.idusuario)
-    )
-    return pd.read_sql(stmt, session.bind)
-
-def get_ttl_task_user(session):
-    stmt = (
-        select(
-            Usuario.nome.label("user"),
-            func.count(Historico.idhist).label("tarefas")
-        )
-        .join(Historico, Historico.idusuario == Usuario.idusuario)
+        .join(Historico, Historico.idhist == Recompensa.idhist)
         .where(Historico.dt_exclusao == None)
-        .group_by(Usuario.idusuario)
+        .group_by(Historico.idusuario)
+        .subquery()
     )
-    return pd.read_sql(stmt, session.bind)
-
-def get_task_fin_user(session):
     stmt = (
         select(
             Usuario.nome.label("user"),
-            func.count(Historico.idhist).label("finalizadas")
+            func.count(Historico.idhist).label("tarefas"),
+            func.sum(case((Historico.finalizada == True, 1), else_=0)).label("finalizadas"),
+            func.sum(case((Historico.finalizada == True, Tarefa.pontos))).label("pontos"),
+            func.coalesce(func.max(recompensas.c.recompensas), 0).label("recompensas")
         )
         .join(Historico, Historico.idusuario == Usuario.idusuario)
-        .where(Historico.dt_exclusao == None, Historico.finalizada == True)
+        .outerjoin(Tarefa, Tarefa.idtarefa == Historico.idtarefa)
+        .outerjoin(recompensas, recompensas.c.idusuario == Usuario.idusuario)
+        .where(Historico.dt_exclusao == None)
         .group_by(Usuario.idusuario)
     )
     return pd.read_sql(stmt, session.bind)
 
 def carregar_dados(session):
-    t_finalizada = get_task_fin_user(session)
-    t_total = get_ttl_task_user(session)
-    t_pontos = get_pts_user(session)
+    stats = get_stats_user(session)
+    t_total = stats[["user", "tarefas"]]
+    t_finalizada = stats.loc[stats["finalizadas"] > 0, ["user", "finalizadas"]].reset_index(drop=True)
+    t_pontos = stats.loc[stats["pontos"].notna(), ["user", "pontos"]].astype({"pontos": "int64"}).reset_index(drop=True)
     tarefa = get_task(session)
     pokemon = get_recom(session)
     return t_finalizada, t_total, t_pontos, tarefa, pokemon
 
+TABELAS_DASH = ["usuario", "historico", "tarefa", "recompensa"]
+
+@st.cache_data(ttl=config.DASH_CACHE_TTL, show_spinner=False)
+def carregar_dados_cache(versoes_tabelas):
+    # As versões das tabelas fazem parte da chave do cache: enquanto a API não
+    # altera nenhuma delas, os dados são servidos sem consultar o banco
+    with next(get_db()) as session:
+        return carregar_dados(session)
+
 def Dash():
 
     with next(get_db()) as session:
-        hist_final, hist_total, pontos, task, pok = carregar_dados(session)
+        versoes_tabelas = tuple(sorted(versoes.atuais(session, TABELAS_DASH).items()))
+    hist_final, hist_total, pontos, task, pok = carregar_dados_cache(versoes_tabelas)
 
     col1, col2 = st.columns([1, 10])
     with col1:
@@ -218,10 +236,10 @@ def Dash():
     ax.tick_params(axis='x', colors='white')
     ax.tick_params(axis='y', colors='white')
 
-    for bar, img_url in zip(bars, pok['img']):
+    imagens = sprites.sprites(list(pok['img']), (14, 17, 23))
+    for bar, img_np in zip(bars, imagens):
         altura = bar.get_height()
         x = bar.get_x() + bar.get_width() / 2
-        img_np = img_fundo(img_url)
         imagebox = OffsetImage(img_np, zoom=0.6)
         ab = AnnotationBbox(imagebox, (x, altura + 0.5), frameon=False)
         ax.add_artist(ab)
@@ -309,7 +327,15 @@ def buscar(tabela, tipo, id):
     headers = {
         "Accept": f'application/{tipo}'
     }
-    response = requests.get(new_url, headers=headers)
+    if id == '':
+        # A listagem é paginada: busca todas as páginas e junta em uma resposta
+        respostas = list(cliente_http.paginas(new_url, headers))
+        response = respostas[-1]
+        if response.status_code != 200:
+            st.error(f"Erro na busca: {response.status_code} - {response.text}")
+            return None
+        return cliente_http.juntar_paginas(respostas, tipo)
+    response = cliente_http.sessao().get(new_url, headers=headers)
     if response.status_code != 200:
         st.error(f"Erro na busca: {response.status_code} - {response.text}")
         return None
@@ -321,7 +347,7 @@ def buscar(tabela, tipo, id):
 def criar(tabela, dados):
     base_url = "https://codewar-apitask.onrender.com/"
     new_url = f'{base_url}{tabela}/'
-    response = requests.post(new_url, json=dados)
+    response = cliente_http.sessao().post(new_url, json=dados)
     if response.status_code in (200, 201):
         st.success("Dados enviados com sucesso!")
         return response.json()
@@ -333,7 +359,7 @@ def criar(tabela, dados):
 def atualizar(tabela, id, dados):
     base_url = "https://codewar-apitask.onrender.com/"
     new_url = f"{base_url}{tabela}/{id}"
-    response = requests.patch(new_url, json=dados)
+    response = cliente_http.sessao().patch(new_url, json=dados)
     if response.status_code == 200:
         st.success(f"{tabela} atualizada com sucesso!")
         return response.json()
@@ -345,7 +371,7 @@ def atualizar(tabela, id, dados):
 def deletar(tabela, id):
     base_url = "https://codewar-apitask.onrender.com/"
     new_url = f"{base_url}{tabela}/{id}"
-    response = requests.delete(new_url)
+    response = cliente_http.sessao().delete(new_url)
     if response.status_code == 204:
         st.success(f"{tabela} deletada com sucesso!")
     else:
@@ -448,16 +474,7 @@ def API():
             else:
                 st.warning("Informe um ID para deletar.")
 
-    texto = read_log("Tarefas.log")
-
-    pdf_bytes = pdf_log(texto)
-
-    st.download_button(
-        label="Baixar Relatório de Logs",
-        data=pdf_bytes,
-        file_name="relatorio_logs_api.pdf",
-        mime="application/pdf"
-    )
+    relatorio_logs("Tarefas.log")
 
 st.markdown(
     """
@@ -1,4 +1,4 @@
-import requests
+import cliente_http
 import json
 
 url = "https://codewar-apitask.onrender.com/"
@@ -13,7 +13,17 @@ def Buscar(tabela, tipo, id):
         "Accept": f'application/{tipo}'
     }
 
-    response = requests.get(new_url, headers=headers)
+    if id == '':
+        # A listagem é paginada: busca todas as páginas e junta em uma resposta
+        respostas = list(cliente_http.paginas(new_url, headers))
+        if respostas[-1].status_code != 200:
+            print(respostas[-1].text)
+            return
+        resultado = cliente_http.juntar_paginas(respostas, tipo)
+        print(json.dumps(resultado, indent= 4, ensure_ascii=False) if tipo == 'json' else resultado)
+        return
+
+    response = cliente_http.sessao().get(new_url, headers=headers)
     if tipo == 'json':
         print(json.dumps(response.json(), indent= 4, ensure_ascii=False))
     else:
@@ -40,7 +50,7 @@ def Criar(tabela):
 
         dados[coluna] = valor
         
-    response = requests.post(new_url, json=dados)
+    response = cliente_http.sessao().post(new_url, json=dados)
 
     if response.status_code == 200 or response.status_code == 201:
         print("Dados enviados com sucesso!")
@@ -56,7 +66,7 @@ def Atualizar(tabela, id, colunas):
         valor = input(f'Digite o novo valor para {coluna} ')
         new_valor[coluna] = valor  
 
-    response = requests.patch(new_url, json=new_valor)
+    response = cliente_http.sessao().patch(new_url, json=new_valor)
 
     if response.status_code == 200:
         print(f"{tabela} atualizada com sucesso!")
@@ -67,7 +77,7 @@ def Atualizar(tabela, id, colunas):
 
 def Deletar(tabela, id):
     new_url = f"{url}/{tabela}/{id}"
-    response = requests.delete(new_url)
+    response = cliente_http.sessao().delete(new_url)
 
     if response.status_code == 204:
         print(f"{tabela} deletada com sucesso!")
@@ -76,7 +86,7 @@ def Deletar(tabela, id):
         print("Detalhes:", response.text)
 
 if __name__ == "__main__":
-    response = requests.get(url)
+    response = cliente_http.sessao().get(url)
     print(json.dumps(response.json(), indent= 4, ensure_ascii=False))
     menu = ('''\n\n------------------ MENU PRINCIPAL-------------: 
                  \n 🟢 1 - Realizar uma busca 
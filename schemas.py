@@ -85,4 +85,23 @@ class RecomOut(RecomBase):
     
     model_config = {
         "from_attributes": True
-        }
\ No newline at end of file
+        }
+class JobOut(BaseModel):
+    idjob: int
+    tipo: str
+    idhist: int
+    pontos: Optional[int] = None
+    status: str
+    tentativas: int
+    max_tentativas: int
+    proxima_execucao: datetime
+    erro: Optional[str] = None
+    dt_inclusao: datetime
+    dt_edicao: Optional[datetime] = None
+
+    model_config = {
+        "from_attributes": True
+        }
+
+class LogNivel(BaseModel):
+    nivel: str
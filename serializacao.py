@@ -0,0 +1,176 @@
+import json
+from datetime import datetime, date
+from functools import lru_cache
+from xml.dom.minidom import parseString
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Caminho rápido de serialização: as colunas dos schemas *Out são lidas com um
+# select() do Core e as linhas viram dicts simples, codificados direto em bytes
+# (orjson quando disponível), sem passar por from_orm + jsonable_encoder.
+# A saída é idêntica à do JSONResponse para esses dados.
+
+def _padrao(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+def dumps(dados) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(dados)
+    return json.dumps(
+        dados,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_padrao
+    ).encode("utf-8")
+
+class JSONRapida(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+# Codificador XML das respostas, com a mesma saída do
+# dicttoxml(jsonable_encoder(dados), custom_root="response", attr_type=False):
+# listas viram elementos <item>, None vira elemento vazio e booleanos "true"/"false".
+# Os tipos das respostas (dict, list, str, int, float, bool, None, datetime) são
+# escritos direto; os demais passam antes pelo jsonable_encoder.
+
+XML_DECLARACAO = '<?xml version="1.0" encoding="UTF-8" ?>'
+
+def _escapar_xml(texto: str) -> str:
+    if "&" in texto:
+        texto = texto.replace("&", "&amp;")
+    if '"' in texto:
+        texto = texto.replace('"', "&quot;")
+    if "'" in texto:
+        texto = texto.replace("'", "&apos;")
+    if "<" in texto:
+        texto = texto.replace("<", "&lt;")
+    if ">" in texto:
+        texto = texto.replace(">", "&gt;")
+    return texto
+
+def _nome_valido(nome) -> bool:
+    try:
+        parseString(f'{XML_DECLARACAO}<{nome}>foo</{nome}>')
+        return True
+    except Exception:
+        return False
+
+@lru_cache(maxsize=4096, typed=True)
+def _tags_xml(chave):
+    # Tags de abertura e fechamento de uma chave, corrigindo nomes inválidos
+    # como o dicttoxml: "n" antes de números, "_" no lugar de espaços e, se
+    # ainda inválido, <key name="...">
+    nome = _escapar_xml(chave) if isinstance(chave, str) else chave
+    atributo = ""
+    if not _nome_valido(nome):
+        if str(nome).isdigit():
+            nome = f"n{nome}"
+        else:
+            try:
+                nome = f"n{float(str(nome))}"
+            except ValueError:
+                if _nome_valido(nome.replace(" ", "_")):
+                    nome = nome.replace(" ", "_")
+                else:
+                    atributo = f' name="{nome}"'
+                    nome = "key"
+    return f"<{nome}{atributo}>", f"</{nome}>"
+
+_TIPOS_XML = frozenset((dict, list, str, int, float, bool, type(None), datetime, date))
+
+def _nativo(valor):
+    return valor if type(valor) in _TIPOS_XML else jsonable_encoder(valor)
+
+def _valor_xml(valor, saida: list, abre: str, fecha: str):
+    tipo = type(valor)
+    if tipo is str:
+        saida.append(abre + _escapar_xml(valor) + fecha)
+    elif tipo is int or tipo is float:
+        saida.append(f"{abre}{valor}{fecha}")
+    elif tipo is bool:
+        saida.append(abre + ("true" if valor else "false") + fecha)
+    elif valor is None:
+        saida.append(abre + fecha)
+    elif tipo is dict:
+        saida.append(abre)
+        _dict_xml(valor, saida)
+        saida.append(fecha)
+    elif tipo is list:
+        saida.append(abre)
+        _lista_xml(valor, saida)
+        saida.append(fecha)
+    else:
+        saida.append(abre + _escapar_xml(valor.isoformat()) + fecha)
+
+def _dict_xml(dados: dict, saida: list):
+    for chave, valor in dados.items():
+        abre, fecha = _tags_xml(chave)
+        _valor_xml(_nativo(valor), saida, abre, fecha)
+
+def _lista_xml(itens, saida: list):
+    for item in itens:
+        item = _nativo(item)
+        if type(item) is list:
+            # Lista dentro de lista: o dicttoxml gera "<item >"
+            saida.append("<item >")
+            _lista_xml(item, saida)
+            saida.append("</item>")
+        elif type(item) is bool:
+            # Dentro de listas o dicttoxml escreve os booleanos como "True"/"False"
+            saida.append(f"<item>{item}</item>")
+        else:
+            _valor_xml(item, saida, "<item>", "</item>")
+
+def item_xml(item: dict) -> str:
+    saida = ["<item>"]
+    _dict_xml(item, saida)
+    saida.append("</item>")
+    return "".join(saida)
+
+def dumps_xml(dados, raiz: str = "response") -> bytes:
+    # Os pedaços do documento vão para uma única lista, unida e codificada uma
+    # vez no final; a listagem em streaming usa item_xml para escrever por lote
+    saida = [f"{XML_DECLARACAO}<{raiz}>"]
+    dados = _nativo(dados)
+    if type(dados) is list:
+        _lista_xml(dados, saida)
+    elif type(dados) is dict:
+        _dict_xml(dados, saida)
+    else:
+        _valor_xml(dados, saida, "<item>", "</item>")
+    saida.append(f"</{raiz}>")
+    return "".join(saida).encode("utf-8")
+
+class XMLRapida(Response):
+    media_type = "application/xml"
+
+    def render(self, content) -> bytes:
+        return dumps_xml(content)
+
+def campos_out(schema):
+    return list(schema.model_fields)
+
+def registro(linha, campos):
+    return dict(zip(campos, linha))
+
+def registro_orm(obj, campos):
+    return {c: getattr(obj, c) for c in campos}
+
+def buscar_registro(db: Session, model, schema, filtros):
+    campos = campos_out(schema)
+    linha = db.execute(select(*[getattr(model, c) for c in campos]).where(*filtros)).first()
+    if linha is None:
+        return None
+    return registro(linha, campos)
@@ -0,0 +1,84 @@
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from config_log import logger
+import cliente_http
+import config
+
+# Cache em disco dos sprites dos Pokémons já compostos sobre a cor de fundo do
+# dashboard (arrays RGB salvos em .npy), evitando baixar e compor as imagens a
+# cada renderização. Os sprites ausentes são baixados em paralelo.
+
+COR_FUNDO = (14, 17, 23)
+
+def _arquivo(url, cor):
+    chave = hashlib.sha1(f"{url}|{cor}".encode("utf-8")).hexdigest()
+    return os.path.join(config.SPRITES_CAMINHO, chave + ".npy")
+
+def compor(dados: bytes, cor=COR_FUNDO) -> np.ndarray:
+    img = Image.open(io.BytesIO(dados)).convert("RGBA")
+    fundo = Image.new("RGBA", img.size, cor + (255,))
+    img = Image.alpha_composite(fundo, img)
+    return np.array(img.convert("RGB"))
+
+def placeholder(cor=COR_FUNDO, tamanho=96) -> np.ndarray:
+    # Círculo cinza sobre o fundo, usado quando o sprite não pode ser baixado
+    img = np.empty((tamanho, tamanho, 3), dtype=np.uint8)
+    img[:] = cor
+    y, x = np.ogrid[:tamanho, :tamanho]
+    centro = tamanho / 2
+    img[(x - centro) ** 2 + (y - centro) ** 2 <= (tamanho / 4) ** 2] = (128, 128, 128)
+    return img
+
+def _ler(url, cor):
+    try:
+        return np.load(_arquivo(url, cor))
+    except (OSError, ValueError):
+        return None
+
+def _salvar(url, cor, img):
+    os.makedirs(config.SPRITES_CAMINHO, exist_ok=True)
+    destino = _arquivo(url, cor)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        np.save(f, img)
+    os.replace(temporario, destino)
+
+def _baixar(url, cor):
+    try:
+        resposta = cliente_http.sessao().get(url)
+        resposta.raise_for_status()
+        img = compor(resposta.content, cor)
+    except Exception as e:
+        # A falha não é gravada no cache: na próxima renderização tenta de novo
+        logger.warning("Falha ao baixar o sprite %s: %s", url, e)
+        return placeholder(cor)
+    _salvar(url, cor, img)
+    return img
+
+def sprite(url, cor=COR_FUNDO) -> np.ndarray:
+    return sprites([url], cor)[0]
+
+def sprites(urls, cor=COR_FUNDO) -> list:
+    # Devolve os sprites na ordem das URLs; os que não estão no cache são baixados
+    # por um pool limitado de threads
+    cor = tuple(cor)
+    imagens = {}
+    faltantes = []
+    for url in dict.fromkeys(urls):
+        if not url:
+            imagens[url] = placeholder(cor)
+            continue
+        img = _ler(url, cor)
+        if img is None:
+            faltantes.append(url)
+        else:
+            imagens[url] = img
+    if faltantes:
+        with ThreadPoolExecutor(max_workers=min(config.SPRITES_WORKERS, len(faltantes))) as executor:
+            for url, img in zip(faltantes, executor.map(lambda u: _baixar(u, cor), faltantes)):
+                imagens[url] = img
+    return [imagens[url] for url in urls]
@@ -0,0 +1,76 @@
+from typing import Optional
+from fastapi.responses import StreamingResponse
+from database import SessionLocal
+from config_log import logger
+import paginacao
+import serializacao
+import config
+
+# Respostas de listagem em streaming: os registros são lidos do banco em lotes
+# (yield_per) e escritos à medida que chegam, sem montar a lista inteira em
+# memória. O formato é escolhido pelo header Accept.
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "xml": "application/xml"
+}
+
+def formato_stream(request, stream: bool) -> Optional[str]:
+    accept = request.headers.get("accept", "application/json").lower()
+    if "application/x-ndjson" in accept:
+        return "ndjson"
+    if not stream:
+        return None
+    if "application/xml" in accept:
+        return "xml"
+    return "json"
+
+def _lotes(stmt, campos):
+    # A sessão é aberta aqui porque o corpo é gerado depois que a dependência get_db já foi finalizada
+    db = SessionLocal()
+    try:
+        resultado = db.execute(stmt.execution_options(yield_per=config.STREAM_LOTE))
+        for particao in resultado.partitions():
+            yield [serializacao.registro(linha, campos) for linha in particao]
+    except Exception as e:
+        logger.error("Erro durante a resposta em streaming: %s", e)
+        raise
+    finally:
+        db.close()
+
+def _gerar_ndjson(lotes):
+    for lote in lotes:
+        yield b"".join(serializacao.dumps(item) + b"\n" for item in lote)
+
+def _gerar_json(lotes):
+    yield b"["
+    primeiro = True
+    for lote in lotes:
+        if not lote:
+            continue
+        pedaco = b",".join(serializacao.dumps(item) for item in lote)
+        yield pedaco if primeiro else b"," + pedaco
+        primeiro = False
+    yield b"]"
+
+def _gerar_xml(lotes):
+    yield f"{serializacao.XML_DECLARACAO}<response>".encode("utf-8")
+    for lote in lotes:
+        yield "".join(serializacao.item_xml(item) for item in lote).encode("utf-8")
+    yield b"</response>"
+
+GERADORES = {
+    "ndjson": _gerar_ndjson,
+    "json": _gerar_json,
+    "xml": _gerar_xml
+}
+
+def resposta_stream(formato: str, model, pk, schema, filtros, after_id: Optional[int] = None,
+                    limit: Optional[int] = None, fields: Optional[str] = None, etag: Optional[str] = None):
+    campos = paginacao.campos_projecao(schema, fields)
+    limite = None if limit is None else min(limit, config.PAGINACAO_MAX)
+    stmt = paginacao.montar_consulta(model, pk, campos, filtros, after_id, limite)
+    logger.debug("Listagem de %s em streaming no formato %s", model.__tablename__, formato)
+    headers = {"ETag": etag, "Vary": "Accept"} if etag else None
+    return StreamingResponse(GERADORES[formato](_lotes(stmt, campos)), media_type=MEDIA_TYPES[formato], headers=headers)
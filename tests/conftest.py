@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Os módulos da API leem a configuração (log, banco, cache) ao serem importados:
+# os testes usam arquivos temporários para não tocar no Tarefas.log nem no tarefas.db
+_pasta = tempfile.mkdtemp(prefix="tarefas-testes-")
+os.environ.setdefault("LOG_ARQUIVO", os.path.join(_pasta, "Tarefas.log"))
+os.environ.setdefault("DB_URL", f"sqlite:///{os.path.join(_pasta, 'tarefas.db')}")
+os.environ.setdefault("CACHE_API_CAMINHO", os.path.join(_pasta, "cache_api.db"))
+os.environ.setdefault("FILA_WORKERS", "0")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
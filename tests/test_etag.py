@@ -0,0 +1,23 @@
+import pytest
+from fastapi.testclient import TestClient
+import main
+
+@pytest.fixture(scope="module")
+def cliente():
+    with TestClient(main.app) as cliente:
+        cliente.post("/task/bulk", json=[{"titulo": f"t{i}", "descricao": "d", "pontos": i} for i in range(1, 4)])
+        yield cliente
+
+def test_etag_distingue_listagem_em_streaming(cliente):
+    lista = cliente.get("/task/", headers={"Accept": "application/json"})
+    ndjson = cliente.get("/task/", headers={"Accept": "application/x-ndjson"})
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    assert lista.headers["ETag"] != ndjson.headers["ETag"]
+
+    # O ETag da lista JSON não vale para o NDJSON da mesma URL
+    condicional = cliente.get("/task/", headers={"Accept": "application/x-ndjson", "If-None-Match": lista.headers["ETag"]})
+    assert condicional.status_code == 200
+    assert len(condicional.text.splitlines()) == len(lista.json())
+
+    condicional = cliente.get("/task/", headers={"Accept": "application/x-ndjson", "If-None-Match": ndjson.headers["ETag"]})
+    assert condicional.status_code == 304
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import declarative_base
+import config
+import instrumentacao_sql
+
+Base = declarative_base()
+
+class Item(Base):
+    __tablename__ = "item"
+    id = Column(Integer, primary_key=True)
+    nome = Column(String, nullable=False, unique=True)
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(config, "DB_INSTRUMENTACAO", True)
+    engine = create_engine("sqlite://")
+    instrumentacao_sql.registrar(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.mark.parametrize("valores", [
+    [{"nome": None}],
+    [{"nome": "a"}, {"nome": "a"}],
+], ids=["not_null", "unique"])
+def test_erro_do_banco_mantem_excecao_original(engine, valores):
+    token = instrumentacao_sql.iniciar()
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(IntegrityError):
+                for valor in valores:
+                    conn.execute(insert(Item).values(**valor))
+            assert conn.info.get("inicio_consulta") == []
+            conn.rollback()
+        assert instrumentacao_sql.atual().quantidade == len(valores) - 1
+    finally:
+        instrumentacao_sql.finalizar(token)
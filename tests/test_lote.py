@@ -0,0 +1,33 @@
+import pytest
+from fastapi.testclient import TestClient
+import lote
+import main
+import schemas
+from models import Tarefa
+
+@pytest.fixture(scope="module")
+def cliente():
+    with TestClient(main.app) as cliente:
+        yield cliente
+
+def test_validar_rejeita_nulo_em_coluna_obrigatoria():
+    validos, erros = lote.validar(
+        [{"idtarefa": 1, "pontos": None}, {"idtarefa": 2, "titulo": None, "descricao": "d"}, {"idtarefa": 3, "pontos": 5}],
+        schemas.TaskUpdate, chave="idtarefa", model=Tarefa
+    )
+    assert [id for _, id, _ in validos] == [3]
+    assert erros == [
+        {"indice": 0, "erro": "Campos não aceitam nulo: pontos", "id": 1},
+        {"indice": 1, "erro": "Campos não aceitam nulo: titulo", "id": 2},
+    ]
+
+def test_patch_em_lote_reporta_nulo_por_item(cliente):
+    ids = cliente.post("/task/bulk", json=[{"titulo": "a", "descricao": "d", "pontos": 1},
+                                           {"titulo": "b", "descricao": "d", "pontos": 2}]).json()["criados"]
+    resposta = cliente.patch("/task/bulk", json=[{"idtarefa": ids[0], "pontos": None},
+                                                 {"idtarefa": ids[1], "pontos": 7}])
+    assert resposta.status_code < 300
+    corpo = resposta.json()
+    assert corpo["erros"] == [{"indice": 0, "erro": "Campos não aceitam nulo: pontos", "id": ids[0]}]
+    assert cliente.get("/task/", params={"id": ids[1]}).json()["pontos"] == 7
+    assert cliente.get("/task/", params={"id": ids[0]}).json()["pontos"] == 1
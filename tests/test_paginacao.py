@@ -0,0 +1,43 @@
+import pytest
+from fastapi.testclient import TestClient
+import config
+import cliente_http
+import main
+
+@pytest.fixture(scope="module")
+def cliente():
+    with TestClient(main.app) as cliente:
+        cliente.post("/user/bulk", json=[{"nome": f"u{i}", "idade": 20, "sexo": "F"} for i in range(250)])
+        yield cliente
+
+def _paginas(cliente, tipo):
+    # Mesmo percurso de cliente_http.paginas, sobre o TestClient
+    headers = {"Accept": f"application/{tipo}"}
+    params = None
+    while True:
+        resposta = cliente.get("/user/", headers=headers, params=params)
+        assert resposta.status_code == 200
+        yield resposta
+        cursor = resposta.headers.get("X-Next-Cursor")
+        if not cursor:
+            return
+        params = {"after_id": cursor}
+
+def test_listagem_sem_limit_usa_pagina_padrao(cliente):
+    resposta = cliente.get("/user/")
+    assert len(resposta.json()) == config.PAGINACAO_PADRAO
+    assert resposta.headers["X-Next-Cursor"] == str(resposta.json()[-1]["idusuario"])
+
+def test_juntar_paginas_json(cliente):
+    respostas = list(_paginas(cliente, "json"))
+    assert len(respostas) > 1
+    itens = cliente_http.juntar_paginas(respostas, "json")
+    ids = [item["idusuario"] for item in itens]
+    assert ids == sorted(set(ids)) and len(ids) >= 250
+
+def test_juntar_paginas_xml(cliente):
+    respostas = list(_paginas(cliente, "xml"))
+    documento = cliente_http.juntar_paginas(respostas, "xml")
+    assert documento.startswith('<?xml version="1.0" encoding="UTF-8" ?><response><item>')
+    assert documento.endswith("</item></response>")
+    assert documento.count("<idusuario>") == len(cliente_http.juntar_paginas(list(_paginas(cliente, "json")), "json"))
@@ -0,0 +1,92 @@
+import hashlib
+from datetime import datetime
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from models import VersaoTabela
+
+# Versão de alteração por tabela: cada transação de uma Session incrementa, no
+# commit, a versão das tabelas que alterou. Leitores (como o dashboard)
+# comparam as versões para saber se precisam consultar os dados de novo.
+
+TABELA_VERSAO = VersaoTabela.__tablename__
+
+def _incrementar(conn, tabelas):
+    tabelas = sorted(set(tabelas) - {TABELA_VERSAO})
+    if not tabelas:
+        return
+    agora = datetime.utcnow()
+    stmt = insert(VersaoTabela).on_conflict_do_update(
+        index_elements=[VersaoTabela.tabela],
+        set_={"versao": VersaoTabela.versao + 1, "dt_edicao": agora}
+    )
+    # Executado direto na conexão para não disparar os eventos da Session
+    conn.execute(stmt, [{"tabela": tabela, "versao": 1, "dt_edicao": agora} for tabela in tabelas])
+
+# As tabelas alteradas são acumuladas em session.info e cada uma tem a versão
+# incrementada uma única vez, no commit, em vez de um upsert por comando
+
+def _marcar(session, tabelas):
+    session.info.setdefault("tabelas_alteradas", set()).update(tabelas)
+
+@event.listens_for(Session, "after_flush")
+def _apos_flush(session, flush_context):
+    tabelas = {
+        objeto.__table__.name
+        for objeto in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(objeto, "__table__")
+    }
+    if tabelas:
+        _marcar(session, tabelas)
+
+@event.listens_for(Session, "do_orm_execute")
+def _apos_dml(orm_execute_state):
+    # INSERT/UPDATE/DELETE em lote (db.execute(update(...)), query().update())
+    # não passam pelo flush
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    tabela = getattr(orm_execute_state.statement, "table", None)
+    if tabela is not None:
+        _marcar(orm_execute_state.session, {tabela.name})
+
+@event.listens_for(Session, "before_commit")
+def _antes_commit(session):
+    # O flush pendente do commit só aconteceria depois deste evento
+    session.flush()
+    tabelas = session.info.pop("tabelas_alteradas", None)
+    if tabelas:
+        _incrementar(session.connection(), tabelas)
+
+@event.listens_for(Session, "after_rollback")
+def _apos_rollback(session):
+    session.info.pop("tabelas_alteradas", None)
+
+def atuais(db: Session, tabelas=None) -> dict:
+    stmt = select(VersaoTabela.tabela, VersaoTabela.versao)
+    if tabelas:
+        stmt = stmt.where(VersaoTabela.tabela.in_(tabelas))
+    try:
+        return dict(db.execute(stmt).all())
+    except OperationalError:
+        # Banco ainda não criado pela API: sem versões, vale apenas o TTL do cache
+        db.rollback()
+        return {}
+
+def versao(db: Session, tabela: str) -> int:
+    return db.execute(select(VersaoTabela.versao).where(VersaoTabela.tabela == tabela)).scalar() or 0
+
+def etag(tabela: str, versao: int, *partes) -> str:
+    # ETag forte: muda sempre que a versão da tabela muda
+    chave = "|".join(str(parte) for parte in (tabela, versao, *partes))
+    return '"' + hashlib.blake2b(chave.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+def etag_corresponde(if_none_match, etag_atual: str) -> bool:
+    # If-None-Match usa comparação fraca (RFC 9110): o prefixo W/ é ignorado
+    if not if_none_match:
+        return False
+    for valor in if_none_match.split(","):
+        valor = valor.strip()
+        if valor == "*" or valor.removeprefix("W/") == etag_atual:
+            return True
+    return False